@@ -1,4 +1,7 @@
-from melodine import base, spotify, youtube, ytmusic
+import importlib
+import os
+
+from melodine.configs import APP_DIR
 
 __all__ = (
     "base",
@@ -7,9 +10,22 @@ __all__ = (
     "youtube",
 )
 
-import os
-
-from melodine.configs import APP_DIR
-
 if not os.path.exists(APP_DIR):
     os.mkdir(APP_DIR)
+
+
+def __getattr__(name: str):
+    """import the backend subpackages only when they're first accessed.
+
+    `import melodine` stays cheap this way; e.g. `melodine.spotify` won't pull in
+    ytmusicapi, innertube or pytube until a ytmusic object is actually used.
+    """
+    if name in __all__:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
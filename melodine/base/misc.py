@@ -1,4 +1,8 @@
+import threading
+import weakref
+from abc import ABCMeta
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -21,11 +25,88 @@ class SearchResultsBase:
         return f"<melo.SearchResults: {id(self)}>"
 
 
-class URIBase:
+def _is_unset(value) -> bool:
+    # `0` is what the models use for counts they don't know (yet), while `False` is a real value
+    if isinstance(value, bool):
+        return False
+    return value is None or (
+        isinstance(value, (int, float, str, list, tuple, dict, set)) and not value
+    )
+
+
+class IdentityMeta(ABCMeta):
+    """
+    Metaclass keeping one canonical instance per `(class, uri)`.
+
+    constructing a model whose uri already has a live instance returns that instance instead,
+    updated with the new data: every public attribute the new data has a value for is overwritten,
+    so a newer fetch always replaces stale values.
+    private attributes (the raw payloads and lazily built or fetched data) are only filled in when unset,
+    and raw payload dicts are merged, so a simplified payload (like an album nested in a track)
+    never drops the keys of a full one.
+    the instances are only weakly referenced, so they're dropped along with their last reference.
+
+    models with no uri, and classes setting `_identity_mapped = False`, aren't mapped.
+    """
+
+    _instances: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __call__(cls, *args, **kwargs):
+        instance = super().__call__(*args, **kwargs)
+        if not getattr(type(instance), "_identity_mapped", True):
+            return instance
+
+        uri = getattr(instance, "uri", None)
+        if not uri:
+            return instance
+
+        key = (type(instance), uri)
+        with IdentityMeta._lock:
+            canonical = IdentityMeta._instances.get(key)
+            if canonical is None:
+                IdentityMeta._instances[key] = instance
+                return instance
+            if canonical is not instance:
+                IdentityMeta._merge(canonical, instance)
+        return canonical
+
+    def _canonical(cls, uri: Optional[str]):
+        """the live instance of the class for `uri`, if there is one"""
+        with IdentityMeta._lock:
+            return IdentityMeta._instances.get((cls, uri))
+
+    @staticmethod
+    def _merge(canonical, instance) -> None:
+        names = set(getattr(instance, "__dict__", {}))
+        for klass in type(instance).__mro__:
+            slots = getattr(klass, "__slots__", ())
+            names.update((slots,) if isinstance(slots, str) else slots)
+
+        for name in names:
+            try:
+                value = getattr(instance, name)
+            except AttributeError:
+                continue
+            if _is_unset(value):
+                continue
+
+            current = getattr(canonical, name, None)
+            if not name.startswith("_") or _is_unset(current):
+                object.__setattr__(canonical, name, value)
+            elif isinstance(current, dict) and isinstance(value, dict):
+                if current is not value:
+                    object.__setattr__(canonical, name, {**current, **value})
+
+
+class URIBase(metaclass=IdentityMeta):
     """
     Base class for generic dataclass dunder methods defined for objects with a `uri` attribute.
 
     All melodine.must inherit from `URIBase`
+
+    instances are shared per uri through `IdentityMeta`,
+    so a artist showing up across a whole library is only one `Artist`.
     """
 
     def __hash__(self):
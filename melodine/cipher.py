@@ -13,10 +13,11 @@ signature and decoding it.
 
 """
 
+import functools
 import logging
 import re
 from itertools import chain
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from pytube.exceptions import ExtractError, RegexMatchError
 from pytube.helpers import cache, regex_search
@@ -24,8 +25,16 @@ from pytube.parser import find_object_from_startpoint, throttling_array_split
 
 logger = logging.getLogger(__name__)
 
+# how many computed values of the throttling parameter (n) a cipher remembers
+N_CACHE_SIZE = 1024
+
 
 class Cipher:
+    js_func_patterns = [
+        r"\w+\.(\w+)\(\w,(\d+)\)",
+        r"\w+\[(\"\w+\")\]\(\w,(\d+)\)",
+    ]
+
     def __init__(self, js: str):
         self.transform_plan: List[str] = get_transform_plan(js)
         var_regex = re.compile(r"^\$*\w+\W")
@@ -34,43 +43,133 @@ class Cipher:
             raise RegexMatchError(caller="__init__", pattern=var_regex.pattern)
         var = var_match.group(0)[:-1]
         self.transform_map = get_transform_map(js, var)
-        self.js_func_patterns = [
-            r"\w+\.(\w+)\(\w,(\d+)\)",
-            r"\w+\[(\"\w+\")\]\(\w,(\d+)\)",
-        ]
+        self.transform_steps = self.compile_transform_plan()
 
         self.throttling_plan = get_throttling_plan(js)
         self.throttling_array = get_throttling_function_array(js)
 
-        self.calculated_n = None
+        self._cached_n = functools.lru_cache(maxsize=N_CACHE_SIZE)(self._transform_n)
+
+    def to_plan(self) -> Dict[str, Any]:
+        """Serialise the extracted plans to a JSON compatible ``dict``.
+
+        The transform functions are stored by name and the references the
+        throttling array holds to itself are stored as a marker, so that
+        :meth:`from_plan` can rebuild the cipher without touching base.js.
 
-    def calculate_n(self, initial_n: list):
-        """Converts n to the correct value to prevent throttling."""
-        if self.calculated_n:
-            return self.calculated_n
+        :rtype: dict
+        """
+        return {
+            "transform_plan": self.transform_plan,
+            "transform_map": {
+                name: fn.__name__ for name, fn in self.transform_map.items()
+            },
+            "throttling_plan": [list(step) for step in self.throttling_plan],
+            "throttling_array": [
+                _encode_throttling_element(el, self.throttling_array)
+                for el in self.throttling_array
+            ],
+        }
+
+    @classmethod
+    def from_plan(cls, plan: Dict[str, Any]) -> "Cipher":
+        """Rebuild a cipher from the output of :meth:`to_plan`.
+
+        :param dict plan:
+            The serialised plans.
+        :rtype: Cipher
+        """
+        cipher = cls.__new__(cls)
+        cipher.transform_plan = plan["transform_plan"]
+        cipher.transform_map = {
+            name: _PLAN_FUNCTIONS[fn_name]
+            for name, fn_name in plan["transform_map"].items()
+        }
+        cipher.transform_steps = cipher.compile_transform_plan()
+        cipher.throttling_plan = [tuple(step) for step in plan["throttling_plan"]]
+        cipher.throttling_array = []
+        cipher.throttling_array.extend(
+            _decode_throttling_element(el, cipher.throttling_array)
+            for el in plan["throttling_array"]
+        )
+        cipher._cached_n = functools.lru_cache(maxsize=N_CACHE_SIZE)(
+            cipher._transform_n
+        )
+        return cipher
+
+    def calculate_n(self, initial_n: Union[str, List[str]]) -> str:
+        """Converts n to the correct value to prevent throttling.
 
-        # First, update all instances of 'b' with the list(initial_n)
-        for i in range(len(self.throttling_array)):
-            if self.throttling_array[i] == "b":
-                self.throttling_array[i] = initial_n
+        Results are memoised per value of n, and the pristine throttling array
+        is never modified, so the same cipher can be used for any number of
+        videos and from multiple threads.
+
+        :param initial_n:
+            The ``n`` query parameter of a stream URL.
+        :rtype: str
+        """
+        return self._cached_n("".join(initial_n))
+
+    def calculate_ns(self, initial_ns: Iterable[str]) -> List[str]:
+        """Convert many values of n at once.
+
+        :param initial_ns:
+            The ``n`` query parameters of a stream URLs.
+        :rtype: list
+        :returns:
+            The converted values, in the same order.
+        """
+        return [self._cached_n(initial_n) for initial_n in initial_ns]
+
+    def _transform_n(self, initial_n: str) -> str:
+        n = list(initial_n)
+
+        # Work on a copy of the array, with the references it holds to itself
+        # pointing to the copy, and all instances of 'b' replaced with n.
+        array = list(self.throttling_array)
+        for i, el in enumerate(array):
+            if el is self.throttling_array:
+                array[i] = array
+            elif el == "b":
+                array[i] = n
 
         for step in self.throttling_plan:
-            curr_func = self.throttling_array[int(step[0])]
+            curr_func = array[int(step[0])]
             if not callable(curr_func):
                 logger.debug(f"{curr_func} is not callable.")
-                logger.debug(f"Throttling array:\n{self.throttling_array}\n")
+                logger.debug(f"Throttling array:\n{array}\n")
                 raise ExtractError(f"{curr_func} is not callable.")
 
-            first_arg = self.throttling_array[int(step[1])]
+            first_arg = array[int(step[1])]
 
             if len(step) == 2:
                 curr_func(first_arg)
             elif len(step) == 3:
-                second_arg = self.throttling_array[int(step[2])]
+                second_arg = array[int(step[2])]
                 curr_func(first_arg, second_arg)
 
-        self.calculated_n = "".join(initial_n)
-        return self.calculated_n
+        return "".join(n)
+
+    def compile_transform_plan(self) -> List[Tuple[Callable, int]]:
+        """Compile the transform plan into the steps that decipher a signature.
+
+        Every JavaScript call in the plan gets parsed once, into its Python
+        equivalent and the argument it's called with.
+
+        :rtype: list
+        :returns:
+            A list of (function, argument) tuples, in the order they are applied.
+
+        **Example**:
+
+        >>> cipher.compile_transform_plan()
+        [(<function reverse>, 15), (<function splice>, 3), (<function swap>, 51)]
+        """
+        steps = []
+        for js_func in self.transform_plan:
+            name, argument = self.parse_function(js_func)  # type: ignore
+            steps.append((self.transform_map[name], argument))
+        return steps
 
     def get_signature(self, ciphered_signature: str) -> str:
         """Decipher the signature.
@@ -84,23 +183,35 @@ class Cipher:
             Decrypted signature required to download the media content.
         """
         signature = list(ciphered_signature)
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        for fn, argument in self.transform_steps:
+            signature = fn(signature, argument)
+            if debug:
+                logger.debug(
+                    "applied transform function\n"
+                    "output: %s\n"
+                    "argument: %d\n"
+                    "function: %s",
+                    "".join(signature),
+                    argument,
+                    fn,
+                )
+        return "".join(signature)
 
-        for js_func in self.transform_plan:
-            name, argument = self.parse_function(js_func)  # type: ignore
-            signature = self.transform_map[name](signature, argument)
-            logger.debug(
-                "applied transform function\n"
-                "output: %s\n"
-                "js_function: %s\n"
-                "argument: %d\n"
-                "function: %s",
-                "".join(signature),
-                name,
-                argument,
-                self.transform_map[name],
-            )
+    def get_signatures(self, ciphered_signatures: Iterable[str]) -> List[str]:
+        """Decipher many signatures at once.
 
-        return "".join(signature)
+        :param ciphered_signatures:
+            The ciphered signatures sent in the ``player_config``.
+        :rtype: list
+        :returns:
+            The decrypted signatures, in the same order.
+        """
+        return [
+            self.get_signature(ciphered_signature)
+            for ciphered_signature in ciphered_signatures
+        ]
 
     @cache
     def parse_function(self, js_func: str) -> Tuple[str, int]:
@@ -690,3 +801,38 @@ def map_functions(js_func: str) -> Callable:
         if re.search(pattern, js_func):
             return fn
     raise RegexMatchError(caller="map_functions", pattern="multiple")
+
+
+# every function a plan can refer to, by name
+_PLAN_FUNCTIONS: Dict[str, Callable] = {
+    fn.__name__: fn
+    for fn in (
+        reverse,
+        splice,
+        swap,
+        throttling_reverse,
+        throttling_push,
+        throttling_unshift,
+        throttling_cipher_function,
+        throttling_nested_splice,
+        throttling_prepend,
+        throttling_swap,
+        js_splice,
+    )
+}
+
+
+def _encode_throttling_element(el: Any, array: List[Any]) -> Any:
+    if el is array:
+        return {"self": True}
+    if callable(el):
+        return {"function": el.__name__}
+    return el
+
+
+def _decode_throttling_element(el: Any, array: List[Any]) -> Any:
+    if isinstance(el, dict):
+        if el.get("self"):
+            return array
+        return _PLAN_FUNCTIONS[el["function"]]
+    return el
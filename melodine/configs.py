@@ -7,6 +7,22 @@ CACHE_PATH = os.path.join(APP_DIR, ".cache")
 
 TEMPFILES_DIR = os.path.join(APP_DIR, ".tempfiles")
 
+# how long (in seconds) the spotify user's profile is reused from disk before it's refetched
+PROFILE_CACHE_TTL = 24 * 60 * 60
+
+# how often (in seconds) to check if YouTube has shipped a new player (base.js) version
+BASE_JS_CHECK_INTERVAL = 6 * 60 * 60
+
+# the most requests made at once when fetching in bulk
+MAX_WORKERS = 8
+
+# how close (from 0 to 1) a YouTube Music video has to be to a spotify track for the match to be kept,
+# tracks matched any less confidently are searched for again the next time they're played
+MATCH_CONFIDENCE_THRESHOLD = 0.6
+
+# how long (in seconds) it's trusted wether an item is saved in the spotify user's library
+LIBRARY_CACHE_TTL = 60
+
 
 # spotify credentials
 CLIENT_ID = "22e27810dff0451bb93a71beb5e4b70d"
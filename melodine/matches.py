@@ -0,0 +1,129 @@
+"""
+a persistent cache of which YouTube Music video a Spotify track was matched to.
+
+playing a Spotify track takes a YouTube Music search to find it's video,
+so matches are kept in a SQLite database under `APP_DIR`, keyed by the Spotify track id
+and by it's ISRC when known (which finds matches for the same recording on other releases).
+every match comes with a confidence score, of how close the video's artists and title are to the track's,
+and only matches scoring at least `MATCH_CONFIDENCE_THRESHOLD` are kept.
+"""
+
+import difflib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from melodine import configs as CONFIG
+from melodine.utils import normalize_query
+
+
+def match_string(artists: Iterable[str], title: str) -> str:
+    """the `"artist, artist - title"` string tracks and videos are compared by"""
+    return ", ".join(artists) + " - " + title
+
+
+def match_confidence(query: str, candidate: str) -> float:
+    """how similar two `match_string`s are, from 0 to 1"""
+    return difflib.SequenceMatcher(
+        None, normalize_query(query), normalize_query(candidate)
+    ).ratio()
+
+
+def best_match(
+    artists: Iterable[str], title: str, results: List[Dict]
+) -> Tuple[str, float]:
+    """pick the ytmusic search result closest to a track's artists and title, returning it's videoId and confidence.
+
+    results scoring the same are picked in the order they were ranked in.
+    """
+    target = match_string(artists, title)
+    scored = [
+        (
+            match_confidence(
+                target,
+                match_string(
+                    (artist["name"] for artist in result.get("artists") or []),
+                    result.get("title") or "",
+                ),
+            ),
+            result["videoId"],
+        )
+        for result in results
+        if result.get("videoId")
+    ]
+    if not scored:
+        raise LookupError(f"no YouTube Music results for {target!r}")
+
+    confidence, video_id = max(scored, key=lambda match: match[0])
+    return video_id, confidence
+
+
+class MatchCache:
+    def __init__(
+        self, path: str = os.path.join(CONFIG.APP_DIR, "matches.sqlite3")
+    ) -> None:
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # opened on first use, and shared by every thread (under the lock)
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    spotify_id TEXT PRIMARY KEY,
+                    isrc TEXT,
+                    video_id TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    matched_at REAL NOT NULL
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS matches_isrc ON matches (isrc)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(
+        self, spotify_id: str, isrc: Optional[str] = None
+    ) -> Optional[Tuple[str, float]]:
+        """get the videoId (and confidence) a track was matched to, by it's id or else it's ISRC"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT video_id, confidence FROM matches WHERE spotify_id = ?",
+                (spotify_id,),
+            ).fetchone()
+            if row is None and isrc:
+                row = self.connection.execute(
+                    "SELECT video_id, confidence FROM matches WHERE isrc = ?"
+                    " ORDER BY confidence DESC LIMIT 1",
+                    (isrc,),
+                ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def put(
+        self,
+        spotify_id: str,
+        isrc: Optional[str],
+        video_id: str,
+        confidence: float,
+    ) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?)",
+                (spotify_id, isrc, video_id, confidence, time.time()),
+            )
+            self.connection.commit()
+
+    def discard(self, spotify_id: str) -> None:
+        """forget a track's match, e.g. when it turned out to be wrong"""
+        with self._lock:
+            self.connection.execute(
+                "DELETE FROM matches WHERE spotify_id = ?", (spotify_id,)
+            )
+            self.connection.commit()
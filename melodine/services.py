@@ -1,21 +1,31 @@
+import hashlib
 import json
 import os
+import re
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Dict, Optional
-from urllib.parse import parse_qs
-
-import requests
-import spotipy
-from innertube import InnerTube
-from ytmusicapi import YTMusic
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Type
+from urllib.parse import parse_qs, unquote, urlsplit
 
 from melodine import configs as CONFIG
-from melodine.cipher import Cipher
-from melodine.utils import singleton
+from melodine.streams import StreamURLCache
+from melodine.utils import atomic_path, singleton
 
+# the backend clients are heavy to import, so they're only imported when first used.
 if TYPE_CHECKING:
+    import httpx
     import pyyoutube
+    import requests
+    import spotipy
+    from innertube import InnerTube
+    from urllib3.util.retry import Retry
     from youtube_dl import YoutubeDL
+    from ytmusicapi import YTMusic
+
+    from melodine.cipher import Cipher
+    from melodine.matches import MatchCache
 
 
 SCOPES = """
@@ -33,6 +43,9 @@ SCOPES = """
             user-read-private
         """  # pylint: disable=invalid-name
 
+# the throttling parameter of a stream URL
+_N_PARAM = re.compile(r"[?&]n=([^&]*)")
+
 YTM_HEADERS = {
     "accept": "*/*",
     "accept-encoding": "gzip, deflate",
@@ -71,11 +84,294 @@ class SpotifyCredentials:
     scopes: str = SCOPES
     app_path: str = CONFIG.APP_DIR
 
+    @property
+    def token_cache_path(self) -> str:
+        """where spotipy keeps the signed in user's tokens"""
+        return os.path.join(self.app_path, "spotify-cache")
+
+
+@dataclass
+class TransportConfig:
+    """connection pooling and retry settings for the HTTP clients of every backend."""
+
+    # number of distinct hosts to keep connection pools for
+    pool_connections: int = 10
+    # number of connections kept alive per host
+    pool_maxsize: int = 20
+    max_retries: int = 3
+    backoff_factor: float = 0.3
+    status_forcelist: Tuple[int, ...] = (500, 502, 503, 504)
+    timeout: float = 30
+    # requests per second allowed to each backend's host, hosts that aren't listed aren't limited
+    rate_limits: Dict[str, float] = field(
+        default_factory=lambda: {
+            "api.spotify.com": 10.0,
+            "music.youtube.com": 5.0,
+            "youtubei.googleapis.com": 5.0,
+            "www.googleapis.com": 5.0,
+        }
+    )
+    # how many requests can go out at once to a host that's been idle for a while
+    rate_burst: int = 10
+
+
+def _retry_after(headers) -> float:
+    """get how many seconds to wait from a response's `Retry-After` header (either seconds or a date)"""
+    value = headers.get("Retry-After")
+    if not value:
+        return 1.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return 1.0
+
+
+class RateLimiter:
+    """a token bucket per host, shared by every thread (and client) sending requests to it.
+
+    every request takes a token, which refill at the host's rate (up to `burst` of them),
+    and a request finding none waits for it's turn instead of being sent.
+    a `429` response pauses the whole host for it's `Retry-After`,
+    so every thread backs off together rather than each one tripping the limit on it's own.
+
+    `stats` reports how many requests are queued per host and how long they've waited.
+    """
+
+    def __init__(self, rates: Dict[str, float], burst: int) -> None:
+        self.rates = rates
+        self.burst = burst
+        self._lock = threading.Lock()
+        # host -> (tokens, last refill), tokens go negative as requests queue up
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _host_stats(self, host: str) -> Dict[str, float]:
+        return self._stats.setdefault(
+            host,
+            {
+                "requests": 0,
+                "queued": 0,
+                "waited": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+                "throttled": 0,
+            },
+        )
+
+    def acquire(self, host: str) -> float:
+        """wait for a host's turn to send a request, returning how long that took"""
+        rate = self.rates.get(host)
+        started = time.monotonic()
+
+        with self._lock:
+            stats = self._host_stats(host)
+            stats["requests"] += 1
+            wait = self._paused_until.get(host, 0.0) - started
+            if rate:
+                tokens, updated = self._buckets.get(host, (self.burst, started))
+                tokens = min(self.burst, tokens + (started - updated) * rate) - 1
+                self._buckets[host] = (tokens, started)
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+            if wait <= 0:
+                return 0.0
+            stats["queued"] += 1
+
+        try:
+            # sleep again if the host was paused while waiting
+            while wait > 0:
+                time.sleep(wait)
+                with self._lock:
+                    wait = self._paused_until.get(host, 0.0) - time.monotonic()
+        finally:
+            waited = time.monotonic() - started
+            with self._lock:
+                stats["queued"] -= 1
+                stats["waited"] += 1
+                stats["total_wait"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+    def pause(self, host: str, seconds: float) -> None:
+        """stop sending requests to a host for `seconds`, from every thread"""
+        with self._lock:
+            self._host_stats(host)["throttled"] += 1
+            self._paused_until[host] = max(
+                self._paused_until.get(host, 0.0), time.monotonic() + seconds
+            )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """per host counts of sent, queued (`queue depth`), waiting and throttled requests,
+        along with the total and longest waits (in seconds), and how much longer the host is paused for.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: dict(
+                    stats, paused_for=max(self._paused_until.get(host, 0.0) - now, 0.0)
+                )
+                for host, stats in self._stats.items()
+            }
+
+
+def _rate_limited_adapter(
+    limiter: RateLimiter, **kwargs
+) -> "requests.adapters.HTTPAdapter":
+    """a `HTTPAdapter` sending every request (and every retry of it) in it's host's turn,
+    and resending the ones answered with a `429` once the host's `Retry-After` is over.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import MaxRetryError
+
+    class RateLimitedAdapter(HTTPAdapter):
+        def __init__(self, max_retries: "Retry", **adapter_kwargs) -> None:
+            # urllib3 resends the statuses it retries on it's own, without waiting for the host's turn,
+            # so it's only left to retry failed connections (which never reached the host)
+            # while responses are retried from `send`
+            super().__init__(
+                max_retries=max_retries.new(status_forcelist=frozenset()),
+                **adapter_kwargs,
+            )
+            self.status_retries = max_retries
+
+        def send(self, request, **send_kwargs):
+            host = urlsplit(request.url).hostname or ""
+            retries = self.status_retries
+            while True:
+                limiter.acquire(host)
+                response = super().send(request, **send_kwargs)
+
+                throttled = response.status_code == 429
+                if throttled:
+                    limiter.pause(host, _retry_after(response.headers))
+                elif not retries.is_retry(request.method, response.status_code):
+                    return response
+
+                try:
+                    retries = retries.increment(
+                        request.method, request.url, response=response.raw
+                    )
+                except MaxRetryError:
+                    return response
+                response.close()
+                if not throttled:
+                    retries.sleep()
+
+    return RateLimitedAdapter(**kwargs)
+
+
+class Transport:
+    """the HTTP layer shared by all the backend clients.
+
+    spotipy, ytmusicapi and pyyoutube send their requests through the same pooled `HTTPAdapter`,
+    so repeated requests to the same Spotify and Google hosts reuse kept-alive (TLS) connections
+    instead of each client opening its own.
+    innertube is built on httpx, so it gets a `httpx.Client` configured with the same limits.
+
+    every request from any of the clients is scheduled through the same `RateLimiter`,
+    which keeps each backend under it's configured rate and honours it's `Retry-After`s.
+
+    the adapter (and it's connection pool) is thread-safe and shared by every thread.
+    each backend client gets it's own `requests.Session` on top of it (from `new_session`),
+    which is used from every thread using that client, as the client itself is.
+    direct requests go through `session` instead, a separate `requests.Session` per thread,
+    so cookies and headers set from one thread don't leak into another.
+    """
+
+    def __init__(self, config: TransportConfig) -> None:
+        self.config = config
+        self._adapter: Optional["requests.adapters.HTTPAdapter"] = None
+        self._lock = threading.Lock()
+        self.limiter = RateLimiter(config.rate_limits, config.rate_burst)
+        self._local = threading.local()
+
+    @property
+    def adapter(self) -> "requests.adapters.HTTPAdapter":
+        from urllib3.util.retry import Retry
+
+        if self._adapter is None:
+            with self._lock:
+                if self._adapter is None:
+                    self._adapter = _rate_limited_adapter(
+                        self.limiter,
+                        pool_connections=self.config.pool_connections,
+                        pool_maxsize=self.config.pool_maxsize,
+                        max_retries=Retry(
+                            total=self.config.max_retries,
+                            connect=None,
+                            read=False,
+                            backoff_factor=self.config.backoff_factor,
+                            status_forcelist=self.config.status_forcelist,
+                            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+                            raise_on_status=False,
+                            # `429`s are handled by the rate limiter instead, which pauses every thread
+                            respect_retry_after_header=False,
+                        ),
+                    )
+        return self._adapter
+
+    def new_session(self) -> "requests.Session":
+        """a new session sending it's requests through the shared adapter"""
+        import requests
+
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    @property
+    def session(self) -> "requests.Session":
+        """the calling thread's session"""
+        session: Optional["requests.Session"] = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self.new_session()
+        return session
+
+    def httpx_client(self, base_url: str = "") -> "httpx.Client":
+        import httpx
+
+        limiter = self.limiter
+        max_retries = self.config.max_retries
+
+        class RateLimitedTransport(httpx.HTTPTransport):
+            """sends every request (and every resend of it) in it's host's turn,
+            resending the ones answered with a `429` once the host's `Retry-After` is over.
+            """
+
+            def handle_request(self, request: "httpx.Request") -> "httpx.Response":
+                host = request.url.host
+                for attempt in range(max_retries + 1):
+                    limiter.acquire(host)
+                    response = super().handle_request(request)
+                    if response.status_code != 429:
+                        break
+                    limiter.pause(host, _retry_after(response.headers))
+                    if attempt == max_retries:
+                        break
+                    response.close()
+                return response
+
+        return httpx.Client(
+            base_url=base_url,
+            timeout=self.config.timeout,
+            limits=httpx.Limits(
+                max_connections=self.config.pool_connections * self.config.pool_maxsize,
+                max_keepalive_connections=self.config.pool_maxsize,
+            ),
+            transport=RateLimitedTransport(retries=self.config.max_retries),
+        )
+
 
 @dataclass
 class ConfigParams:
     # ytm-cookies, yt-key, spotify-creds
     spotify_creds: SpotifyCredentials = field(default_factory=SpotifyCredentials)
+    transport: TransportConfig = field(default_factory=TransportConfig)
     ytm_headers: dict = field(default_factory=lambda: YTM_HEADERS)
     ytm_cookie: str = field(default_factory=lambda: CONFIG.YTMUSIC_COOKIE)
     yt_api_key: str = CONFIG.YT_API_KEY
@@ -84,60 +380,115 @@ class ConfigParams:
 
 @singleton
 class Services:
+    """lazily built clients for every backend.
+
+    `Services` is safe to share between threads. each client (and the cipher) is built
+    exactly once, by whichever thread asks for it first, while the other threads wait for it.
+    the clients themselves (and their sessions) are shared by every thread afterwards,
+    while direct requests made through `transport.session` use a per-thread session.
+
+    requests to each backend are rate limited by `transport.limiter`,
+    whose `stats()` show how many requests are queued per backend and how long they've waited.
+    """
+
     def __init__(self, config_params: ConfigParams = ConfigParams()):
         self.config = config_params
+        self.transport = Transport(self.config.transport)
+
+        # guards the construction of the backend clients
+        self._lock = threading.RLock()
+        # guards loading base.js and building the cipher from it, which can take a while
+        self._cipher_lock = threading.RLock()
 
-        self.__spotify: Optional[spotipy.Spotify] = None
-        self.__ytmusic: Optional[YTMusic] = None
-        self.__yt: Optional[pyyoutube.Api] = None
-        self.__ytdl: Optional[YoutubeDL] = None
-        self.__innertube: Optional[InnerTube] = None
+        self.__spotify: Optional["spotipy.Spotify"] = None
+        self.__ytmusic: Optional["YTMusic"] = None
+        self.__yt: Optional["pyyoutube.Api"] = None
+        self.__ytdl: Optional["YoutubeDL"] = None
+        self.__innertube: Optional["InnerTube"] = None
+        self.__matches: Optional["MatchCache"] = None
 
         self._base_js_url: Optional[str] = None
+        self._base_js_version: Optional[str] = None
         self._base_js_content: Optional[str] = None
 
-        self._base_js_path = os.path.join(CONFIG.APP_DIR, "base-js-cache.json")
-        self._cipher: Optional[Cipher] = None
+        # the player scripts are saved as `<player-version>.js`,
+        # along with a `latest.json` for the last seen version and when it was checked.
+        self._base_js_dir = os.path.join(CONFIG.APP_DIR, "base-js")
+        self._cipher_plans_dir = os.path.join(CONFIG.APP_DIR, "cipher-plans")
+        self._cipher: Optional["Cipher"] = None
+
+        self.streams = StreamURLCache()
+
+    @property
+    def matches(self) -> "MatchCache":
+        """the Spotify to YouTube Music match cache, only imported and opened once it's used"""
+        from melodine.matches import MatchCache
+
+        if self.__matches is None:
+            with self._lock:
+                if self.__matches is None:
+                    self.__matches = MatchCache()
+        return self.__matches
 
     @property
     def spotify(self) -> "spotipy.Spotify":
+        import spotipy
+
         if self.__spotify is None:
-            if os.path.exists(self.config.spotify_creds.app_path):
-                self.__spotify = spotipy.Spotify(
-                    auth_manager=spotipy.SpotifyOAuth(
-                        scope=self.config.spotify_creds.scopes,
-                        client_id=self.config.spotify_creds.client_id,
-                        client_secret=self.config.spotify_creds.client_secret,
-                        redirect_uri="http://localhost:8080/",
-                        cache_handler=spotipy.CacheFileHandler(
-                            cache_path=os.path.join(
-                                self.config.spotify_creds.app_path, "spotify-cache"
-                            )
-                        ),
-                    )
-                )
-            else:
-                self.__spotify = spotipy.Spotify(
-                    auth_manager=spotipy.SpotifyClientCredentials(
-                        client_id=self.config.spotify_creds.client_id,
-                        client_secret=self.config.spotify_creds.client_secret,
-                    )
-                )
+            with self._lock:
+                if self.__spotify is None:
+                    if os.path.exists(self.config.spotify_creds.app_path):
+                        self.__spotify = spotipy.Spotify(
+                            auth_manager=spotipy.SpotifyOAuth(
+                                scope=self.config.spotify_creds.scopes,
+                                client_id=self.config.spotify_creds.client_id,
+                                client_secret=self.config.spotify_creds.client_secret,
+                                redirect_uri="http://localhost:8080/",
+                                cache_handler=spotipy.CacheFileHandler(
+                                    cache_path=self.config.spotify_creds.token_cache_path
+                                ),
+                                requests_session=self.transport.new_session(),
+                            ),
+                            requests_session=self.transport.new_session(),
+                            requests_timeout=self.config.transport.timeout,
+                        )
+                    else:
+                        self.__spotify = spotipy.Spotify(
+                            auth_manager=spotipy.SpotifyClientCredentials(
+                                client_id=self.config.spotify_creds.client_id,
+                                client_secret=self.config.spotify_creds.client_secret,
+                                requests_session=self.transport.new_session(),
+                            ),
+                            requests_session=self.transport.new_session(),
+                            requests_timeout=self.config.transport.timeout,
+                        )
         return self.__spotify
 
-    def _ytmusic(self, cookie: Optional[str] = None) -> YTMusic:
+    def _ytmusic(self, cookie: Optional[str] = None) -> "YTMusic":
         """exists only to get a YTM object explicitly from the cookie given as the param"""
+        from ytmusicapi import YTMusic
+
         return (
-            YTMusic(auth=json.dumps(self.config.ytm_headers.update({"cookie": cookie})))
+            YTMusic(
+                auth=json.dumps(self.config.ytm_headers.update({"cookie": cookie})),
+                requests_session=self.transport.new_session(),
+            )
             if cookie
             else self.ytmusic
         )
 
     @property
-    def ytmusic(self) -> YTMusic:
+    def ytmusic(self) -> "YTMusic":
+        from ytmusicapi import YTMusic
+
         if self.__ytmusic is None:
-            self.config.ytm_headers.update({"cookie": CONFIG.YTMUSIC_COOKIE})
-            self.__ytmusic = YTMusic(auth=json.dumps(self.config.ytm_headers))
+            with self._lock:
+                if self.__ytmusic is None:
+                    self.config.ytm_headers.update({"cookie": CONFIG.YTMUSIC_COOKIE})
+                    self.__ytmusic = YTMusic(
+                        auth=json.dumps(self.config.ytm_headers),
+                        requests_session=self.transport.new_session(),
+                    )
         return self.__ytmusic
 
     @property
@@ -145,7 +496,9 @@ class Services:
         from youtube_dl import YoutubeDL
 
         if self.__ytdl is None:
-            self.__ytdl = YoutubeDL(self.config.ytdl_config)
+            with self._lock:
+                if self.__ytdl is None:
+                    self.__ytdl = YoutubeDL(self.config.ytdl_config)
         return self.__ytdl
 
     @property
@@ -153,46 +506,238 @@ class Services:
         import pyyoutube
 
         if self.__yt is None:
-            self.__yt = pyyoutube.Api(self.config.yt_api_key)
+            with self._lock:
+                if self.__yt is None:
+                    self.__yt = pyyoutube.Api(api_key=self.config.yt_api_key)
+                    self.__yt.session = self.transport.new_session()
         return self.__yt
 
     @property
-    def innertube(self) -> InnerTube:
+    def innertube(self) -> "InnerTube":
+        from innertube import InnerTube
+        from innertube.config import config as innertube_config
+
         if self.__innertube is None:
-            self.__innertube = InnerTube("WEB_MUSIC")
+            with self._lock:
+                if self.__innertube is None:
+                    self.__innertube = InnerTube("WEB_MUSIC")
+                    # swap innertube's own client for the shared transport's
+                    self.__innertube.adaptor.session.close()
+                    self.__innertube.adaptor.session = self.transport.httpx_client(
+                        base_url=innertube_config.base_url
+                    )
         return self.__innertube
 
-    def _get_base_js(self):
-        self._base_js_url = self.ytmusic.get_basejs_url()
-        return {
-            "base_js_url": self._base_js_url,
-            "base_js_content": requests.get(self._base_js_url, timeout=30).text,
-        }
+    @staticmethod
+    def _player_version(base_js_url: str) -> str:
+        """get the player version from a base.js URL
+
+        for e.g. `/s/player/4fcd6e4a/player_ias.vflset/en_US/base.js` -> `4fcd6e4a`
+        """
+        match = re.search(r"/s/player/([\w-]+)/", base_js_url)
+        return match.group(1) if match else base_js_url.rsplit("/", 1)[-1]
+
+    def _read_latest_basejs(self) -> Optional[Dict]:
+        try:
+            with open(
+                os.path.join(self._base_js_dir, "latest.json"), "r", encoding="utf-8"
+            ) as latest:
+                return json.load(latest)
+        except (OSError, ValueError):
+            return None
+
+    def _prune_basejs(self, keep: str) -> None:
+        """remove the player scripts of all versions except `keep`"""
+        # from before the player scripts were stored by version
+        legacy_path = os.path.join(CONFIG.APP_DIR, "base-js-cache.json")
+        stale = [
+            os.path.join(self._base_js_dir, name)
+            for name in os.listdir(self._base_js_dir)
+            if name.endswith(".js") and name != keep + ".js"
+        ]
+        for path in stale + [legacy_path]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # already removed, e.g. by another process pruning at the same time
+                pass
+
+    def refresh_basejs(self, force: bool = False) -> bool:
+        """check the current player version and download it's base.js if it has changed.
+
+        only a single (small) request for the player URL is made when the version is unchanged.
+        the cipher gets rebuilt next time it's needed if the version did change.
+
+        Returns
+        -------
+        changed: `bool`
+            wether a new player script was downloaded.
+        """
+        with self._cipher_lock:
+            os.makedirs(self._base_js_dir, exist_ok=True)
+
+            base_js_url = self.ytmusic.get_basejs_url()
+            version = self._player_version(base_js_url)
+            script_path = os.path.join(self._base_js_dir, version + ".js")
+
+            changed = force or not os.path.exists(script_path)
+            if changed:
+                content = self.transport.session.get(
+                    base_js_url, timeout=self.config.transport.timeout
+                ).text
+                with atomic_path(script_path) as temp_path:
+                    with open(temp_path, "w", encoding="utf-8") as script:
+                        script.write(content)
+
+            with atomic_path(
+                os.path.join(self._base_js_dir, "latest.json")
+            ) as temp_path:
+                with open(temp_path, "w", encoding="utf-8") as latest:
+                    json.dump(
+                        {
+                            "url": base_js_url,
+                            "version": version,
+                            "checked_at": time.time(),
+                        },
+                        latest,
+                    )
+            self._prune_basejs(keep=version)
+
+            if version != self._base_js_version or changed:
+                self._base_js_url = base_js_url
+                self._base_js_version = version
+                self._base_js_content = None
+                self._cipher = None
+            return changed
 
     @property
     def basejs(self) -> str:
-        if not os.path.exists(self._base_js_path):
-            with open(self._base_js_path, "w", encoding="utf-8") as basejs:
-                json.dump(self._get_base_js(), basejs)
-        with open(self._base_js_path, "r", encoding="utf") as basejs:
-            data: Dict[str, str] = json.load(basejs)
-            (
-                self._base_js_url,
-                self._base_js_content,
-            ) = data.values()
+        """the player script (base.js), kept in memory once loaded.
+
+        it's read from disk on the first access,
+        with the player version being checked first if it hasn't been in a while.
+        """
+        if self._base_js_content is None:
+            with self._cipher_lock:
+                if self._base_js_content is None:
+                    latest = self._read_latest_basejs()
+                    if (
+                        latest is None
+                        or time.time() - latest["checked_at"]
+                        > CONFIG.BASE_JS_CHECK_INTERVAL
+                        or not os.path.exists(
+                            os.path.join(self._base_js_dir, latest["version"] + ".js")
+                        )
+                    ):
+                        self.refresh_basejs()
+                        latest = self._read_latest_basejs()
+
+                    with open(
+                        os.path.join(self._base_js_dir, latest["version"] + ".js"),
+                        "r",
+                        encoding="utf-8",
+                    ) as script:
+                        self._base_js_content = script.read()
+                    self._base_js_url = latest["url"]
+                    self._base_js_version = latest["version"]
         return self._base_js_content
 
     @property
-    def cipher(self) -> Cipher:
+    def cipher(self) -> "Cipher":
+        from melodine.cipher import Cipher
+
         if self._cipher is None:
-            self._cipher = Cipher(js=self.basejs)
+            with self._cipher_lock:
+                if self._cipher is None:
+                    self._cipher = self._load_cipher(Cipher)
         return self._cipher
 
+    def _load_cipher(self, cipher_cls: Type["Cipher"]) -> "Cipher":
+        """build the cipher for the current player script.
+
+        extracting the signature and throttling plans from base.js is slow,
+        so the extracted plans are saved under a hash of the script and loaded directly after that.
+        """
+        js = self.basejs
+        plan_name = hashlib.sha1(js.encode("utf-8")).hexdigest() + ".json"
+        plan_path = os.path.join(self._cipher_plans_dir, plan_name)
+
+        try:
+            with open(plan_path, "r", encoding="utf-8") as plan:
+                return cipher_cls.from_plan(json.load(plan))
+        except (OSError, ValueError, KeyError):
+            pass
+
+        cipher = cipher_cls(js=js)
+        os.makedirs(self._cipher_plans_dir, exist_ok=True)
+        with atomic_path(plan_path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as plan:
+                json.dump(cipher.to_plan(), plan)
+        for name in os.listdir(self._cipher_plans_dir):
+            # plans still being written by other processes are left alone
+            if name != plan_name and name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self._cipher_plans_dir, name))
+                except FileNotFoundError:
+                    # already removed by another process pruning at the same time
+                    pass
+        return cipher
+
     def sign_url(self, sig_cipher: str) -> str:
+        """get a playable stream URL from a format's `signatureCipher`.
+
+        besides adding the deciphered signature, the throttling parameter (`n`)
+        gets rewritten too, otherwise the stream is served at a fraction of the line speed.
+        """
         parsed_query = parse_qs(sig_cipher)
         signature = self.cipher.get_signature(ciphered_signature=parsed_query["s"][0])
         signed_url = parsed_query["url"][0] + "&sig=" + signature + "&ratebypass=yes"
-        return signed_url
+        return self.dethrottle_url(signed_url)
+
+    def dethrottle_url(self, url: str) -> str:
+        """replace the `n` query parameter of a stream URL with it's deciphered value"""
+        match = _N_PARAM.search(url)
+        if match is None:
+            return url
+        n = self.cipher.calculate_n(unquote(match.group(1)))
+        return url[: match.start(1)] + n + url[match.end(1) :]
+
+    def stream_url(self, video_id: str, itag: Optional[int] = None) -> str:
+        """get a playable URL for one of a video's streams.
+
+        the last (highest quality) adaptive format is used unless a specific `itag` is asked for.
+        resolved URLs are cached (across processes too) until they expire,
+        after which they get resolved again.
+        """
+        stream_format = "default" if itag is None else str(itag)
+
+        url = self.streams.get(video_id, stream_format)
+        if url is not None:
+            return url
+
+        streaming_data = self.innertube.player(video_id)["streamingData"]
+        if itag is None:
+            stream = streaming_data["adaptiveFormats"][-1]
+        else:
+            stream = next(
+                stream
+                for stream in streaming_data["adaptiveFormats"]
+                + streaming_data.get("formats", [])
+                if stream["itag"] == itag
+            )
+
+        url = (
+            self.sign_url(stream["signatureCipher"])
+            if "signatureCipher" in stream
+            else self.dethrottle_url(stream["url"])
+        )
+        self.streams.put(
+            video_id,
+            stream_format,
+            url,
+            expires_in=float(streaming_data["expiresInSeconds"]),
+        )
+        return url
 
     # TODO: spotify and ytmusci oauth implementations
     def spotify_auth(self, client_id, client_secret):
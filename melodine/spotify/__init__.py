@@ -8,7 +8,8 @@ from melodine.spotify.device import Device
 from melodine.spotify.user import User
 from melodine.spotify.player import Player
 from melodine.spotify.category import Category
-from melodine.spotify._search import search
+from melodine.spotify._search import search, search_many
+from melodine.spotify.audio import audio_features_batch
 from melodine.spotify.client import client
 
 # client = Client()
@@ -25,5 +26,7 @@ __all__ = [
     "Device",
     "Category",
     "search",
+    "search_many",
+    "audio_features_batch",
     "client",
 ]
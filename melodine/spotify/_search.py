@@ -1,11 +1,14 @@
+import functools
 from dataclasses import dataclass, field
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
+from melodine import configs as CONFIG
 from melodine.base.misc import SearchResultsBase
 from melodine.services import service
 from melodine.spotify import Album, Artist, Episode, Playlist, Show, Track
+from melodine.utils import iter_concurrently, normalize_query
 
-__all__ = ["search"]
+__all__ = ["search", "search_many"]
 
 _TYPES = {
     "artist": Artist,
@@ -17,6 +20,9 @@ _TYPES = {
 }
 _SEARCH_TYPES = {"artists", "albums", "tracks", "playlists", "shows", "episodes"}
 
+# how many (normalized) queries `search_many` keeps the results of
+_CACHE_SIZE = 1024
+
 
 @dataclass(repr=False, frozen=True)
 class SpotifySearchResults(SearchResultsBase):
@@ -106,3 +112,56 @@ def search(
             for key, value in data.items()
         }
     )
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _search_cached(
+    q: str, types: Tuple[str, ...], limit: int  # pylint: disable=invalid-name
+) -> SpotifySearchResults:
+    return search(q, types=types, limit=limit)
+
+
+def search_many(
+    queries: Iterable[str],
+    *,
+    types: Iterable[str] = (
+        "tracks",
+        "playlists",
+        "artists",
+        "albums",
+        "shows",
+        "episodes",
+    ),
+    limit: int = 20,
+    ordered: bool = True,
+    window: int = CONFIG.MAX_WORKERS,
+) -> Iterator[Tuple[str, Union[SpotifySearchResults, Exception]]]:
+    """Get search results for many queries at once, as `(query, results)` pairs.
+
+    The queries are searched concurrently (at most `window` at once, under the shared rate limit),
+    and the results are reused for queries differing only in case and whitespace.
+    A query whose search fails is paired with the exception instead of it's results,
+    so one failure doesn't stop the rest of the queries.
+
+    Parameters
+    ----------
+    queries: `Iterable[str]`
+        The queries to search for.
+    types: `Iterable[str]`
+        The types of results to get, same as for `search`.
+    limit: `int`
+        The maximum number of results per type.
+    ordered: `bool`
+        Wether to yield the results in the same order as the queries,
+        or as soon as each one arrives.
+    window: `int`
+        The maximum number of searches running at once.
+    """
+    types = tuple(sorted(set(types)))
+    return iter_concurrently(
+        lambda query: _search_cached(normalize_query(query), types, limit),
+        queries,
+        ordered=ordered,
+        window=window,
+        return_exceptions=True,
+    )
@@ -1,11 +1,14 @@
-from typing import List
+from typing import Iterable, List, Optional
 
 from melodine.base.album import AlbumBase
 from melodine.base.misc import URIBase
 from melodine.services import service
 from melodine.spotify.artist import Artist
 from melodine.spotify.track import Track
-from melodine.utils import Image
+from melodine.utils import Image, fetch_by_ids, iter_offset_pages
+
+# the most tracks the album tracks endpoint returns per request
+_PAGE_SIZE = 50
 
 
 class Album(URIBase):
@@ -28,6 +31,7 @@ class Album(URIBase):
     __slots__ = (
         "_data",
         "_tracks",
+        "_total_tracks",
         "artists",
         "images",
         "href",
@@ -51,7 +55,11 @@ class Album(URIBase):
         self.images = [Image(**image) for image in data.get("images", [])]
 
         self.artists = [Artist(artist) for artist in data.get("artists")]
-        self._total_tracks = data.get("total_tracks", 0)
+        # full album payloads embed the first page of tracks (and their total),
+        # which `tracks` and `get_tracks` are served from before requesting any more
+        self._total_tracks = data.get("total_tracks") or data.get("tracks", {}).get(
+            "total", 0
+        )
         self._tracks = []
 
     def __repr__(self) -> str:
@@ -61,6 +69,14 @@ class Album(URIBase):
     def from_id(cls, id: str) -> "Album":
         return cls(data=service.spotify.album(id))
 
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> List[Optional["Album"]]:
+        """get many albums at once, in the same order as the given ids.
+
+        ids that don't resolve to an album are `None` in the results.
+        """
+        return fetch_by_ids(cls, service.spotify.albums, "albums", ids, batch_size=20)
+
     @property
     def total_tracks(self) -> int:
         """get all the tracks from an album"""
@@ -69,27 +85,51 @@ class Album(URIBase):
             self._total_tracks = service.spotify.album_tracks(self.id, limit=1)["total"]
         return self._total_tracks
 
+    def _seed_tracks(self) -> None:
+        # built on first use rather than in `__init__`,
+        # since every `Track` builds an `Album` from the same data
+        if not self._tracks and self._data.get("tracks"):
+            self._tracks = [
+                Track(track, album=self._data)
+                for track in self._data["tracks"].get("items", [])
+            ]
+
     @property
-    def tracks(self):
-        """get all the tracks from the album"""
-        offset = 0
-
-        while len(self._tracks) < self.total_tracks:
-            data = service.spotify.album_tracks(self.id, limit=50, offset=offset)
-            offset += 50
-            self._tracks += list(
-                Track(track, album=self._data) for track in data["items"]
+    def tracks(self) -> List[Track]:
+        """get all the tracks from the album
+
+        only the pages that weren't embedded in the album's data are requested, concurrently.
+        """
+        self._seed_tracks()
+
+        if len(self._tracks) < self.total_tracks:
+            pages = iter_offset_pages(
+                lambda offset: service.spotify.album_tracks(
+                    self.id, limit=_PAGE_SIZE, offset=offset
+                ),
+                total=self.total_tracks,
+                page_size=_PAGE_SIZE,
+                start=len(self._tracks),
             )
+            self._tracks += [
+                Track(track, album=self._data)
+                for page in pages
+                for track in page["items"]
+            ]
         return self._tracks
 
     def get_tracks(self, limit: int = 20, offset: int = 0) -> List[Track]:
         """get specific tracks from an album based on the limit and offsets"""
-        if len(self._tracks) == 0:
-            data = service.spotify.album_tracks(self.id, limit=limit, offset=offset)
-            for track in data["items"]:
-                track["album"] = self._data
-            self._tracks = list(Track(_track) for _track in data["items"])
-        return self._tracks
+        self._seed_tracks()
+
+        loaded = len(self._tracks)
+        if offset + limit <= loaded or (
+            self._total_tracks and loaded >= self._total_tracks
+        ):
+            return self._tracks[offset : offset + limit]
+
+        data = service.spotify.album_tracks(self.id, limit=limit, offset=offset)
+        return list(Track(track, album=self._data) for track in data["items"])
 
     # @cached_property
     # def get_all_tracks(self) -> List[Track]:
@@ -1,12 +1,16 @@
-from typing import Any, Dict, List, Literal, Union
+from typing import Any, Dict, Iterable, List, Literal, Optional, Union
 
-from melodine.utils import Image
+from melodine import configs as CONFIG
+from melodine.utils import Image, fetch_by_ids, iter_paginated, map_concurrently
 from melodine.base.misc import URIBase
 
 
 from melodine.services import service
 from melodine.base.artist import ArtistBase
 
+# the most albums the artist albums endpoint returns per request
+_PAGE_SIZE = 50
+
 
 class Artist(URIBase):
     """
@@ -39,6 +43,7 @@ class Artist(URIBase):
         "id",
         "uri",
         "_albums",
+        "_total_albums",
     )
 
     def __init__(self, data: Dict):
@@ -51,6 +56,7 @@ class Artist(URIBase):
         self.images = [Image(**image) for image in data.get("images", [])]
 
         self._albums: List[Union[Any, Dict[str, Any]]] = list()
+        self._total_albums: Optional[int] = None
 
     def __repr__(self) -> str:
         return f"melo.Artist - {(self.name or self.id or self.uri)!r}"
@@ -59,6 +65,14 @@ class Artist(URIBase):
     def from_id(cls, id: str) -> "Artist":
         return cls(data=service.spotify.artist(id))
 
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> List[Optional["Artist"]]:
+        """get many artists at once, in the same order as the given ids.
+
+        ids that don't resolve to an artist are `None` in the results.
+        """
+        return fetch_by_ids(cls, service.spotify.artists, "artists", ids, batch_size=50)
+
     @property
     def albums(self):
         if not self._albums:
@@ -67,7 +81,11 @@ class Artist(URIBase):
 
     @property
     def total_albums(self):
-        return service.spotify.artist_albums(self.id, limit=1)["total"]
+        if self._total_albums is None:
+            self._total_albums = service.spotify.artist_albums(self.id, limit=1)[
+                "total"
+            ]
+        return self._total_albums
 
     def get_albums(
         self,
@@ -79,22 +97,60 @@ class Artist(URIBase):
 
         if len(self._albums) == 0:
             data = service.spotify.artist_albums(
-                self.id, limit=limit, offset=offset, album_type=album_type
+                self.id, limit=limit, offset=offset, include_groups=album_type
             )
             self._albums = list(Album(album) for album in data["items"])
         return self._albums
 
-    def get_all_albums(self):
+    def get_all_albums(
+        self,
+        album_types: Iterable[
+            Literal["album", "single", "appears_on", "compilation"]
+        ] = ("album", "single", "appears_on", "compilation"),
+        *,
+        hydrate: bool = False,
+        window: int = CONFIG.MAX_WORKERS,
+    ) -> List:
+        """get the artist's whole discography.
+
+        the pages of every album type are fetched concurrently, with the total being requested only once per type.
+        albums listed more than once are dropped, keeping the order they're first listed in.
+
+        Parameters
+        ----------
+        album_types: `Iterable[str]`
+            the types of albums to get, in the order they're listed in.
+        hydrate: `bool`
+            wether to get the full albums (with their tracks) instead of the simplified ones,
+            which takes a batched request for every 20 albums.
+        window: `int`
+            the most pages requested at once.
+        """
         from .album import Album
 
-        offset = 0
-
-        while len(self._albums) < self.total_albums:
-            data = service.spotify.artist_albums(self.id, limit=50)
-
-            offset += 50
-            self._albums.extend(list(Album(album) for album in data["items"]))
-        return list(set(self._albums))
+        def fetch_albums(album_type: str) -> List[Dict[str, Any]]:
+            pages = iter_paginated(
+                lambda offset: service.spotify.artist_albums(
+                    self.id, include_groups=album_type, limit=_PAGE_SIZE, offset=offset
+                ),
+                page_size=_PAGE_SIZE,
+                window=window,
+            )
+            return [album for page in pages for album in page["items"]]
+
+        seen = set()
+        albums = []
+        for albums_of_type in map_concurrently(fetch_albums, list(album_types)):
+            for album in albums_of_type:
+                if album["uri"] not in seen:
+                    seen.add(album["uri"])
+                    albums.append(album)
+
+        if hydrate:
+            self._albums = Album.from_ids([album["id"] for album in albums])
+        else:
+            self._albums = [Album(album) for album in albums]
+        return self._albums
 
     def tracks(self):
         from .track import Track
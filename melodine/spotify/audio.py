@@ -0,0 +1,254 @@
+"""
+audio features and analyses, laid out as NumPy arrays.
+
+the features are requested in batches of 100 ids (the most the API allows per request),
+and kept in memory by track id so a track's features are only ever requested once.
+
+analyses are converted to contiguous arrays and stored as `.npy` files under `CACHE_PATH`,
+which are memory-mapped when loaded instead of being parsed.
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from melodine import configs as CONFIG
+from melodine.services import service
+from melodine.utils import atomic_path, chunks, map_concurrently
+
+if TYPE_CHECKING:
+    import numpy
+
+    from melodine.spotify.track import Track
+
+# the numeric audio features, in the order they're laid out in the feature arrays
+FEATURES = (
+    "danceability",
+    "energy",
+    "key",
+    "loudness",
+    "mode",
+    "speechiness",
+    "acousticness",
+    "instrumentalness",
+    "liveness",
+    "valence",
+    "tempo",
+    "duration_ms",
+    "time_signature",
+)
+
+_BATCH_SIZE = 100
+
+# the fields kept for every segment, section and time interval (beats, bars and tatums) of an analysis
+SEGMENT_FIELDS = (
+    "start",
+    "duration",
+    "confidence",
+    "loudness_start",
+    "loudness_max_time",
+    "loudness_max",
+    "loudness_end",
+)
+SECTION_FIELDS = (
+    "start",
+    "duration",
+    "confidence",
+    "loudness",
+    "tempo",
+    "tempo_confidence",
+    "key",
+    "key_confidence",
+    "mode",
+    "mode_confidence",
+    "time_signature",
+    "time_signature_confidence",
+)
+INTERVAL_FIELDS = ("start", "duration", "confidence")
+
+ANALYSIS_PATH = os.path.join(CONFIG.CACHE_PATH, "audio-analysis")
+
+_features: Dict[str, Optional[Dict]] = {}
+_features_lock = threading.Lock()
+
+
+def has_numpy() -> bool:
+    """wether numpy (an optional dependency) is installed, without importing it"""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError(
+            "numpy is needed for feature arrays, install it with `pip install melodine[numpy]`"
+        ) from error
+    return numpy
+
+
+def audio_features(tracks: Iterable[Union["Track", str]]) -> List[Optional[Dict]]:
+    """get the audio features of many tracks (or track ids), in the same order as the given tracks.
+
+    tracks without audio features are `None` in the results.
+    """
+    ids = [track if isinstance(track, str) else track.id for track in tracks]
+
+    with _features_lock:
+        missing = list(dict.fromkeys(id for id in ids if id not in _features))
+
+    if missing:
+        pages = map_concurrently(
+            lambda batch: service.spotify.audio_features(batch) or [None] * len(batch),
+            chunks(missing, _BATCH_SIZE),
+        )
+        with _features_lock:
+            for id, features in zip(missing, (item for page in pages for item in page)):
+                _features[id] = features
+
+    with _features_lock:
+        return [_features.get(id) for id in ids]
+
+
+def audio_features_batch(tracks: Iterable[Union["Track", str]]) -> "numpy.ndarray":
+    """get the audio features of many tracks (or track ids) as a NumPy structured array.
+
+    the array has a row for every given track (in the same order), with an `id` field and a
+    float field for each of the `FEATURES`, so whole playlists can be filtered and sorted at once,
+    e.g. `features[features["energy"] > 0.8]` or `numpy.sort(features, order="tempo")`.
+    the features of tracks without any are `nan`.
+
+    needs numpy, which is an optional dependency (`pip install melodine[numpy]`).
+    """
+    numpy = _numpy()
+
+    ids = [track if isinstance(track, str) else track.id for track in tracks]
+    dtype = numpy.dtype([("id", "U22")] + [(feature, "f8") for feature in FEATURES])
+
+    array = numpy.empty(len(ids), dtype=dtype)
+    for row, (id, features) in enumerate(zip(ids, audio_features(ids))):
+        features = features or {}
+        array[row] = (id, *(features.get(feature, numpy.nan) for feature in FEATURES))
+    return array
+
+
+def _records(numpy, items: List[Dict], fields: Iterable[str]) -> "numpy.ndarray":
+    fields = tuple(fields)
+    dtype = numpy.dtype([(field, "f8") for field in fields])
+    return numpy.array(
+        [tuple(item.get(field, numpy.nan) for field in fields) for item in items],
+        dtype=dtype,
+    )
+
+
+class AudioAnalysis:
+    """A track's audio analysis, as NumPy arrays.
+
+    Attributes
+    ----------
+    track: `Dict`
+        the track level analysis (tempo, key, loudness, ...).
+    segments: `numpy.ndarray`
+        a structured array with the `SEGMENT_FIELDS` of every segment.
+    pitches: `numpy.ndarray`
+        a `(segments, 12)` array of every segment's pitch (chroma) vector.
+    timbre: `numpy.ndarray`
+        a `(segments, 12)` array of every segment's timbre vector.
+    sections: `numpy.ndarray`
+        a structured array with the `SECTION_FIELDS` of every section.
+    beats, bars, tatums: `numpy.ndarray`
+        structured arrays with the `INTERVAL_FIELDS` of every beat, bar and tatum.
+    """
+
+    ARRAYS = ("segments", "pitches", "timbre", "sections", "beats", "bars", "tatums")
+
+    __slots__ = ("track",) + ARRAYS
+
+    def __init__(self, track: Dict, **arrays: "numpy.ndarray") -> None:
+        self.track = track
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __repr__(self) -> str:
+        return f"<melo.AudioAnalysis: {len(self.segments)} segments>"
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "AudioAnalysis":
+        """convert a audio analysis response to arrays."""
+        numpy = _numpy()
+
+        segments = data.get("segments", [])
+        return cls(
+            track=data.get("track", {}),
+            segments=_records(numpy, segments, SEGMENT_FIELDS),
+            pitches=numpy.array(
+                [segment["pitches"] for segment in segments], dtype="f4"
+            ).reshape(-1, 12),
+            timbre=numpy.array(
+                [segment["timbre"] for segment in segments], dtype="f4"
+            ).reshape(-1, 12),
+            sections=_records(numpy, data.get("sections", []), SECTION_FIELDS),
+            beats=_records(numpy, data.get("beats", []), INTERVAL_FIELDS),
+            bars=_records(numpy, data.get("bars", []), INTERVAL_FIELDS),
+            tatums=_records(numpy, data.get("tatums", []), INTERVAL_FIELDS),
+        )
+
+    def save(self, path: str) -> None:
+        """store the analysis in a directory, as a `.npy` file for every array."""
+        numpy = _numpy()
+
+        try:
+            with atomic_path(path) as temp_path:
+                os.makedirs(temp_path, exist_ok=True)
+                for name in self.ARRAYS:
+                    numpy.save(
+                        os.path.join(temp_path, name + ".npy"), getattr(self, name)
+                    )
+                with open(
+                    os.path.join(temp_path, "track.json"), "w", encoding="utf-8"
+                ) as file:
+                    json.dump(self.track, file)
+        except OSError:
+            # another process stored it first
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str) -> "AudioAnalysis":
+        """load a stored analysis, with it's arrays memory-mapped (read only)."""
+        numpy = _numpy()
+
+        with open(os.path.join(path, "track.json"), "r", encoding="utf-8") as file:
+            track = json.load(file)
+        return cls(
+            track=track,
+            **{
+                name: numpy.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+                for name in cls.ARRAYS
+            },
+        )
+
+
+def audio_analysis(track: Union["Track", str]) -> AudioAnalysis:
+    """get a track's (or track id's) audio analysis as arrays.
+
+    the analysis is only requested once, after which it's loaded from `CACHE_PATH`.
+
+    needs numpy, which is an optional dependency (`pip install melodine[numpy]`).
+    """
+    id = track if isinstance(track, str) else track.id
+    path = os.path.join(ANALYSIS_PATH, id)
+
+    if os.path.isfile(os.path.join(path, "track.json")):
+        try:
+            return AudioAnalysis.load(path)
+        except (OSError, ValueError):
+            shutil.rmtree(path, ignore_errors=True)
+
+    analysis = AudioAnalysis.from_data(service.spotify.audio_analysis(id))
+    os.makedirs(ANALYSIS_PATH, exist_ok=True)
+    analysis.save(path)
+    return analysis
@@ -1,5 +1,11 @@
-from typing import List, Literal
-
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from melodine import configs as CONFIG
 from melodine.base.misc import URIBase
 from melodine.services import service
 from melodine.spotify.album import Album
@@ -10,13 +16,127 @@ from melodine.spotify.player import Player
 from melodine.spotify.playlist import Playlist
 from melodine.spotify.show import Show
 from melodine.spotify.track import PlaylistTrack, Track
-from melodine.utils import Image, singleton
+from melodine.utils import (
+    Image,
+    LazyProxy,
+    chunks,
+    iter_paginated,
+    map_concurrently,
+    singleton,
+)
+
+# the most items the library endpoints return per request
+_PAGE_SIZE = 50
+
+_PROFILE_PATH = os.path.join(CONFIG.APP_DIR, "spotify-profile.json")
+
+
+def _signed_in_account() -> Optional[str]:
+    """identify the signed in account by (a hash of) it's refresh token,
+    which stays the same across token refreshes and changes when signing in again.
+    """
+    try:
+        with open(
+            service.config.spotify_creds.token_cache_path, "r", encoding="utf-8"
+        ) as token_cache:
+            refresh_token = json.load(token_cache).get("refresh_token")
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not refresh_token:
+        return None
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def _current_user() -> Dict:
+    """get the current user's profile, reusing the copy saved on disk while it's fresh.
+
+    saves a token refresh and a `/me` request on every start.
+    the saved profile is only used for the account it was fetched with,
+    so signing in to another account fetches the profile again.
+    """
+    account = _signed_in_account()
+    try:
+        with open(_PROFILE_PATH, "r", encoding="utf-8") as profile:
+            cached: Dict = json.load(profile)
+        if (
+            account is not None
+            and cached["account"] == account
+            and time.time() - cached["fetched_at"] < CONFIG.PROFILE_CACHE_TTL
+        ):
+            return cached["data"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    data = service.spotify.current_user()
+    # signing in happens on the first request, so the account is only known after it
+    account = _signed_in_account()
+    with open(_PROFILE_PATH, "w", encoding="utf-8") as profile:
+        json.dump(
+            {"fetched_at": time.time(), "account": account, "data": data}, profile
+        )
+    return data
+
+
+class _Library:
+    """one kind of items (tracks, albums, ...) saved in the current user's library.
+
+    checks, saves and unsaves many ids at once, in concurrent batches of the most ids the endpoints take.
+    wether an id is saved is remembered for `LIBRARY_CACHE_TTL` seconds,
+    and updated right away when it's saved or unsaved through here.
+    """
+
+    def __init__(self, kind: str, batch_size: int) -> None:
+        self.kind = kind
+        self.batch_size = batch_size
+        self._saved: Dict[str, Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, action: str):
+        return getattr(service.spotify, f"current_user_saved_{self.kind}_{action}")
+
+    def _remember(self, ids: Iterable[str], saved: Iterable[bool]) -> None:
+        now = time.time()
+        with self._lock:
+            for id, is_saved in zip(ids, saved):
+                self._saved[id] = (is_saved, now)
+
+    def contains(self, ids: Iterable[str]) -> Dict[str, bool]:
+        ids = list(dict.fromkeys(ids))
+        expired = time.time() - CONFIG.LIBRARY_CACHE_TTL
+
+        with self._lock:
+            results = {
+                id: self._saved[id][0]
+                for id in ids
+                if id in self._saved and self._saved[id][1] > expired
+            }
+
+        missing = [id for id in ids if id not in results]
+        if missing:
+            pages = map_concurrently(
+                self._endpoint("contains"), chunks(missing, self.batch_size)
+            )
+            saved = [is_saved for page in pages for is_saved in page]
+            self._remember(missing, saved)
+            results.update(zip(missing, saved))
+
+        return {id: results[id] for id in ids}
+
+    def add(self, ids: Iterable[str]) -> None:
+        ids = list(dict.fromkeys(ids))
+        map_concurrently(self._endpoint("add"), chunks(ids, self.batch_size))
+        self._remember(ids, [True] * len(ids))
+
+    def remove(self, ids: Iterable[str]) -> None:
+        ids = list(dict.fromkeys(ids))
+        map_concurrently(self._endpoint("delete"), chunks(ids, self.batch_size))
+        self._remember(ids, [False] * len(ids))
 
 
 @singleton
 class Client(URIBase):
     def __init__(self) -> None:
-        data = service.spotify.current_user()
+        data = _current_user()
 
         self.id = data.get("id")
         self.name = data.get("display_name")
@@ -26,6 +146,11 @@ class Client(URIBase):
         self.type = data.get("type")
         self.images = [Image(**image_) for image_ in data.get("images", [])]
 
+        self._saved_tracks = _Library("tracks", 50)
+        self._saved_albums = _Library("albums", 20)
+        self._saved_episodes = _Library("episodes", 50)
+        self._saved_shows = _Library("shows", 50)
+
     def __repr__(self):
         return f"<spotify.Client: {(self.name or 'Unauthorized')!r}>"
 
@@ -68,18 +193,22 @@ class Client(URIBase):
         data = service.spotify.current_user_followed_artists(limit=limit)
         return [Artist(artist) for artist in data["artists"]["items"]]
 
-    # @cached_property
-    # def all_followed_artists(self) -> List[Artist]:
-    #     data = {"next": "<placeholder>"}
-    #     results = []
+    def iter_followed_artists(self) -> Iterator[Artist]:
+        """Iterate over all the artists followed by the user.
 
-    #     while data.get("next"):
-    #         if data["next"] == "<placeholder>":
-    #             data = service.spotify.current_user_followed_artists()["artists"]
-    #         else:
-    #             data = service.spotify.next(data)["artists"]
-    #         results += data["items"]
-    #     return [Artist(artist) for artist in results]
+        Followed artists are paged by a cursor rather than an offset,
+        so unlike the other `iter_*` listings, the pages can only be fetched one after the other.
+        """
+        after = None
+        while True:
+            data = service.spotify.current_user_followed_artists(
+                limit=_PAGE_SIZE, after=after
+            )["artists"]
+            for artist in data["items"]:
+                yield Artist(artist)
+            after = data.get("cursors", {}).get("after")
+            if not data.get("next") or after is None:
+                break
 
     def is_playlist_followed(self, playlist_id: str) -> bool:
         return service.spotify.playlist_is_following(playlist_id, [self.id])
@@ -95,61 +224,81 @@ class Client(URIBase):
         data = service.spotify.current_user_playlists(limit=limit, offset=offset)
         return [Playlist(playlist) for playlist in data["items"]]
 
-    # @cached_property
-    # def all_saved_playlists(self) -> List[Playlist]:
-    #     data = {"next": "<placeholder>"}
-    #     results = []
-
-    #     while data.get("next"):
-    #         if data["next"] == "<placeholder>":
-    #             data = service.spotify.current_user_playlists()
-    #         else:
-    #             data = service.spotify.next(data)
-    #         results += data["items"]
-    #     return [Playlist(playlist) for playlist in results]
+    def iter_saved_playlists(
+        self, *, window: int = CONFIG.MAX_WORKERS
+    ) -> Iterator[Playlist]:
+        """Iterate over all the user's playlists, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_playlists(
+                limit=_PAGE_SIZE, offset=offset
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for playlist in page["items"]:
+                yield Playlist(playlist)
 
     def is_album_saved(self, album_id: str) -> bool:
         """Check if an album is already saved in
         the current Spotify user’s “Your Music” library.
         """
-        return service.spotify.current_user_saved_albums_contains([album_id])[0]
+        return self.are_albums_saved([album_id])[album_id]
+
+    def are_albums_saved(self, album_ids: Iterable[str]) -> Dict[str, bool]:
+        """Check which of the albums are saved in the current user's library."""
+        return self._saved_albums.contains(album_ids)
 
     def save_album(self, album_id: str) -> None:
         """Add one or more albums to the current user's
         "Your Music" library.
         """
-        return service.spotify.current_user_saved_albums_add([album_id])
+        self.save_albums([album_id])
+
+    def save_albums(self, album_ids: Iterable[str]) -> None:
+        self._saved_albums.add(album_ids)
 
     def unsave_album(self, album_id: str):
-        return service.spotify.current_user_saved_albums_delete([album_id])
+        self.unsave_albums([album_id])
+
+    def unsave_albums(self, album_ids: Iterable[str]) -> None:
+        self._saved_albums.remove(album_ids)
 
     def saved_albums(self, *, limit: int = 20, offset: int = 0) -> List[Album]:
         data = service.spotify.current_user_saved_albums(limit=limit, offset=offset)
         return [Album(album["album"]) for album in data["items"]]
 
-    # @cached_property
-    # def all_saved_albums(self) -> List[Album]:
-    #     data = {"next": "<placeholder>"}
-    #     results = []
-
-    #     while data.get("next"):
-    #         if data["next"] == "<placeholder>":
-    #             # print("lmao")
-    #             data = service.spotify.current_user_saved_albums()
-    #             # print(data.keys())
-    #         else:
-    #             data = service.spotify.next(data)
-    #         results += data["items"]
-    #     return [Album(album["album"]) for album in results]
+    def iter_saved_albums(self, *, window: int = CONFIG.MAX_WORKERS) -> Iterator[Album]:
+        """Iterate over all the user's saved albums, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_saved_albums(
+                limit=_PAGE_SIZE, offset=offset
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for album in page["items"]:
+                yield Album(album["album"])
 
     def is_track_saved(self, track_id: str) -> bool:
-        return service.spotify.current_user_saved_tracks_contains([track_id])[0]
+        return self.are_tracks_saved([track_id])[track_id]
+
+    def are_tracks_saved(self, track_ids: Iterable[str]) -> Dict[str, bool]:
+        """Check which of the tracks are saved in the current user's library."""
+        return self._saved_tracks.contains(track_ids)
 
     def save_track(self, track_id: str) -> None:
-        return service.spotify.current_user_saved_tracks_add([track_id])
+        self.save_tracks([track_id])
+
+    def save_tracks(self, track_ids: Iterable[str]) -> None:
+        self._saved_tracks.add(track_ids)
 
     def unsave_track(self, track_id: str) -> None:
-        return service.spotify.current_user_saved_tracks_delete([track_id])
+        self.unsave_tracks([track_id])
+
+    def unsave_tracks(self, track_ids: Iterable[str]) -> None:
+        self._saved_tracks.remove(track_ids)
 
     def saved_tracks(self, *, limit: int = 20, offset: int = 0) -> List[PlaylistTrack]:
         data = service.spotify.current_user_saved_tracks(limit=limit, offset=offset)
@@ -160,72 +309,98 @@ class Client(URIBase):
             results.append(track)
         return results
 
-    # @cached_property
-    # def all_saved_tracks(self) -> List[PlaylistTrack]:
-    #     data = {"next": "<placeholder>"}
-    #     results = []
-
-    #     while data.get("next"):
-    #         if data["next"] == "<placeholder>":
-    #             data = service.spotify.current_user_saved_tracks()
-    #         else:
-    #             data = service.spotify.next(data)
-    #         results += data["items"]
-    #     for idx, track in enumerate(results.copy()):
-    #         track["added_by"] = self
-    #         track = PlaylistTrack(track)
-    #         results[idx] = track
-    #     return results
+    def iter_saved_tracks(
+        self, *, window: int = CONFIG.MAX_WORKERS
+    ) -> Iterator[PlaylistTrack]:
+        """Iterate over all the user's liked tracks, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_saved_tracks(
+                limit=_PAGE_SIZE, offset=offset
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for track in page["items"]:
+                track["added_by"] = self
+                yield PlaylistTrack(track)
 
     def is_episode_saved(self, episode_id: str) -> bool:
-        return service.spotify.current_user_saved_episodes_contains([episode_id])[0]
+        return self.are_episodes_saved([episode_id])[episode_id]
+
+    def are_episodes_saved(self, episode_ids: Iterable[str]) -> Dict[str, bool]:
+        """Check which of the episodes are saved in the current user's library."""
+        return self._saved_episodes.contains(episode_ids)
 
     def save_episode(self, episode_id: str) -> None:
-        return service.spotify.current_user_saved_episodes_add([episode_id])
+        self.save_episodes([episode_id])
+
+    def save_episodes(self, episode_ids: Iterable[str]) -> None:
+        self._saved_episodes.add(episode_ids)
 
     def unsave_episode(self, episode_id: str) -> None:
-        return service.spotify.current_user_saved_episodes_delete([episode_id])
+        self.unsave_episodes([episode_id])
+
+    def unsave_episodes(self, episode_ids: Iterable[str]) -> None:
+        self._saved_episodes.remove(episode_ids)
 
     def saved_episodes(self, *, limit: int = 20, offset: int = 0) -> List[Episode]:
         data = service.spotify.current_user_saved_episodes(limit=limit, offset=offset)
         return [Episode(episode["episode"]) for episode in data["items"]]
 
-    # def all_saved_episodes(self) -> List[Episode]:
-    #     data = {"next": "<placeholder>"}
-    #     results = []
-
-    #     while data.get("next"):
-    #         if data["next"] == "<placeholder>":
-    #             data = service.spotify.current_user_saved_episodes()
-    #         else:
-    #             data = service.spotify.next(data)
-    #         results += data["items"]
-    #     return [Episode(episode["episode"]) for episode in results]
+    def iter_saved_episodes(
+        self, *, window: int = CONFIG.MAX_WORKERS
+    ) -> Iterator[Episode]:
+        """Iterate over all the user's saved episodes, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_saved_episodes(
+                limit=_PAGE_SIZE, offset=offset
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for episode in page["items"]:
+                yield Episode(episode["episode"])
 
     def is_show_saved(self, show_id: str) -> bool:
-        return service.spotify.current_user_saved_shows_contains([show_id])[0]
+        return self.are_shows_saved([show_id])[show_id]
+
+    def are_shows_saved(self, show_ids: Iterable[str]) -> Dict[str, bool]:
+        """Check which of the shows are saved in the current user's library."""
+        return self._saved_shows.contains(show_ids)
 
     def save_show(self, show_id: str) -> None:
-        return service.spotify.current_user_saved_shows_add([show_id])
+        self.save_shows([show_id])
+
+    def save_shows(self, show_ids: Iterable[str]) -> None:
+        self._saved_shows.add(show_ids)
 
     def unsave_show(self, show_id: str) -> None:
-        return service.spotify.current_user_saved_shows_delete([show_id])
+        self.unsave_shows([show_id])
+
+    def unsave_shows(self, show_ids: Iterable[str]) -> None:
+        self._saved_shows.remove(show_ids)
 
     def saved_shows(self, *, limit: int = 20, offset: int = 0) -> List[Show]:
         data = service.spotify.current_user_saved_shows(limit=limit, offset=offset)
         return [Show(show["show"]) for show in data["items"]]
 
-    def all_saved_shows(self) -> List[Show]:
-        data = {"next": "<placeholder>"}
-        results = []
+    def iter_saved_shows(self, *, window: int = CONFIG.MAX_WORKERS) -> Iterator[Show]:
+        """Iterate over all the user's saved shows, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_saved_shows(
+                limit=_PAGE_SIZE, offset=offset
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for show in page["items"]:
+                yield Show(show["show"])
 
-        while data.get("next"):
-            if data["next"] == "<placeholder>":
-                data = service.spotify.current_user_saved_shows()
-            else:
-                data = service.spotify.next(data)
-            results += data["items"]
-        return [Show(show["show"]) for show in results]
+    def all_saved_shows(self) -> List[Show]:
+        return list(self.iter_saved_shows())
 
     def top_artists(
         self,
@@ -238,6 +413,24 @@ class Client(URIBase):
         )
         return [Artist(artist_) for artist_ in data["items"]]
 
+    def iter_top_artists(
+        self,
+        time_range: Literal["long_term", "short_term", "medium_term"] = "medium_term",
+        *,
+        window: int = CONFIG.MAX_WORKERS,
+    ) -> Iterator[Artist]:
+        """Iterate over all the user's top artists, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_top_artists(
+                limit=_PAGE_SIZE, offset=offset, time_range=time_range
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for artist_ in page["items"]:
+                yield Artist(artist_)
+
     def top_tracks(
         self,
         limit: int = 20,
@@ -249,5 +442,24 @@ class Client(URIBase):
         )
         return [Track(track_) for track_ in data["items"]]
 
+    def iter_top_tracks(
+        self,
+        time_range: Literal["long_term", "short_term", "medium_term"] = "medium_term",
+        *,
+        window: int = CONFIG.MAX_WORKERS,
+    ) -> Iterator[Track]:
+        """Iterate over all the user's top tracks, with up to `window` pages fetched at once."""
+        pages = iter_paginated(
+            lambda offset: service.spotify.current_user_top_tracks(
+                limit=_PAGE_SIZE, offset=offset, time_range=time_range
+            ),
+            page_size=_PAGE_SIZE,
+            window=window,
+        )
+        for page in pages:
+            for track_ in page["items"]:
+                yield Track(track_)
+
 
-client = Client()
+# only authenticates (and loads the profile) once the client is actually used
+client = LazyProxy(Client)
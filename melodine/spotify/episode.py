@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import Iterable, List, Optional
 
-from melodine.utils import Image
+from melodine.utils import Image, fetch_by_ids
 from melodine.base.misc import URIBase
 
 
@@ -37,6 +37,16 @@ class Episode(URIBase):
     def from_id(cls, id: str) -> "Episode":
         return cls(data=service.spotify.episode(id))
 
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> List[Optional["Episode"]]:
+        """get many episodes at once, in the same order as the given ids.
+
+        ids that don't resolve to an episode are `None` in the results.
+        """
+        return fetch_by_ids(
+            cls, service.spotify.episodes, "episodes", ids, batch_size=50
+        )
+
     @property
     def show(self):
         from .show import Show
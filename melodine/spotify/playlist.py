@@ -1,8 +1,19 @@
-from typing import Dict, List, Union
+import datetime
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Union
 
 from melodine import spotify
 
-from melodine.utils import Image
+from melodine import configs as CONFIG
+from melodine.utils import (
+    Image,
+    atomic_path,
+    chunks,
+    iter_offset_pages,
+    map_concurrently,
+)
 from melodine.base.misc import URIBase
 
 
@@ -10,12 +21,44 @@ from melodine.services import service
 from melodine.spotify.track import PlaylistTrack, Track
 from melodine.base.playlist import PlaylistBase
 
+# the most items the playlist tracks endpoint returns per request
+_PAGE_SIZE = 100
+
+# the most items that can be added or removed per request
+_WRITE_LIMIT = 100
+
+# where the tracks of playlists are cached, along with the snapshot they're from
+_CACHE_DIR = os.path.join(CONFIG.CACHE_PATH, "playlists")
+
+# everything about a playlist but it's tracks, to check it's snapshot against the cache with
+_METADATA_FIELDS = "id,name,owner,snapshot_id,uri,public,collaborative,description,followers,images,tracks.total"
+
+
+def _raw_item(track: PlaylistTrack) -> Dict:
+    item = dict(track._item)
+    # tracks added through `add_items` are added by the client, instead of raw user data
+    added_by = item.get("added_by")
+    if added_by is not None and not isinstance(added_by, dict):
+        item["added_by"] = {
+            "id": added_by.id,
+            "uri": added_by.uri,
+            "display_name": added_by.name,
+            "type": "user",
+        }
+    return item
+
+
+def _track_or_none(item: Dict) -> Optional[PlaylistTrack]:
+    # unavailable (and local) tracks come without any track data,
+    # they're kept as `None` so the loaded items line up with the positions in the playlist
+    return PlaylistTrack(item) if item.get("track") else None
+
 
 class Playlist(URIBase):  # pylint: disable=too-many-instance-attributes
     """A Spotify playlist object"""
 
     __slots__ = (
-        "tracks",
+        "_items",
         "total_tracks",
         "images",
         "href",
@@ -46,8 +89,8 @@ class Playlist(URIBase):  # pylint: disable=too-many-instance-attributes
         self.description: str = data.get("description")
         self.followers: int = data.get("followers", {}).get("total", 0)
 
-        self.tracks: List[PlaylistTrack] = (
-            [PlaylistTrack(track) for track in data["tracks"]["items"]]
+        self._items: List[Optional[PlaylistTrack]] = (
+            [_track_or_none(item) for item in data["tracks"]["items"]]
             if "items" in data["tracks"]
             else []
         )
@@ -58,12 +101,78 @@ class Playlist(URIBase):  # pylint: disable=too-many-instance-attributes
 
         self.total_tracks: int = data.get("tracks")["total"]
 
+    @property
+    def tracks(self) -> List[PlaylistTrack]:
+        """the tracks loaded so far, without the unavailable ones"""
+        return [track for track in self._items if track is not None]
+
     def __repr__(self) -> str:
         return f"melo.Playlist - {(self.name or self.id or self.uri)!r}"
 
     @classmethod
     def from_id(cls, id: str) -> "Playlist":
-        return cls(data=service.spotify.playlist(id))
+        """Get a playlist by it's id.
+
+        Only the playlist's details are requested when it's tracks are cached on disk from the same snapshot,
+        in which case all of it's tracks are loaded from the cache. Otherwise the first page of tracks is requested.
+        """
+        data = service.spotify.playlist(id, fields=_METADATA_FIELDS)
+
+        # a loaded instance of the playlist comes back from the identity map,
+        # along with the tracks it loaded from it's (possibly older) snapshot
+        loaded = cls._canonical(data.get("uri"))
+        changed = loaded is not None and loaded.snapshot_id != data.get("snapshot_id")
+
+        playlist = cls(data=data)
+        playlist.snapshot_id = data.get("snapshot_id")
+        playlist.total_tracks = data["tracks"]["total"]
+        if changed:
+            playlist._items = []
+
+        if playlist._load_cached_tracks():
+            return playlist
+
+        data = service.spotify.playlist_tracks(id, limit=_PAGE_SIZE)
+        playlist._items = [_track_or_none(item) for item in data["items"]]
+        if playlist._fully_loaded:
+            playlist._save_cached_tracks()
+        return playlist
+
+    @property
+    def _cache_file(self) -> str:
+        return os.path.join(_CACHE_DIR, f"{self.id}.json")
+
+    def _load_cached_tracks(self) -> bool:
+        try:
+            with open(self._cache_file, "r", encoding="utf-8") as cached:
+                data = json.load(cached)
+        except (OSError, ValueError):
+            return False
+        if not self.snapshot_id or data.get("snapshot_id") != self.snapshot_id:
+            return False
+
+        self._items = [_track_or_none(item) for item in data["items"]]
+        self.total_tracks = len(self._items)
+        return True
+
+    def _save_cached_tracks(self) -> None:
+        """cache all of the playlist's tracks on disk, for the current snapshot"""
+        if not self.snapshot_id:
+            return
+
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with atomic_path(self._cache_file) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as cached:
+                json.dump(
+                    {
+                        "snapshot_id": self.snapshot_id,
+                        "items": [
+                            {"track": None} if track is None else _raw_item(track)
+                            for track in self._items
+                        ],
+                    },
+                    cached,
+                )
 
     def get_tracks(self, limit: int = 20, offset: int = 0) -> List[PlaylistTrack]:
         """Get  a list of tracks based on the given limit and offset
@@ -81,15 +190,19 @@ class Playlist(URIBase):  # pylint: disable=too-many-instance-attributes
             A list of tracks from the playlist.
         """
 
-        if (offset + limit) < self.total_tracks:
+        if (offset + limit) <= len(self._items):
             return [
-                PlaylistTrack(track_) for track_ in self.tracks[offset : offset + limit]
+                track_
+                for track_ in self._items[offset : offset + limit]
+                if track_ is not None
             ]
 
         # TODO - Use multi-type results with playlist items (it returns episodes as well)
         data = service.spotify.playlist_tracks(self.id, limit=limit, offset=offset)
 
-        return [PlaylistTrack(track_) for track_ in data["items"]]
+        return [
+            PlaylistTrack(track_) for track_ in data["items"] if track_.get("track")
+        ]
 
     def get_all_tracks(self) -> List[PlaylistTrack]:
         """Get a list of all the tracks in aplaylist
@@ -97,34 +210,201 @@ class Playlist(URIBase):  # pylint: disable=too-many-instance-attributes
         This operation might take long depending on the size of the playlist.
         """
 
-        if len(self.tracks) >= self.total_tracks:
+        if self._fully_loaded:
             return self.tracks
 
-        self.tracks = []
-        offset = 0
+        return list(self.iter_tracks())
 
-        while len(self.tracks) < self.total_tracks:
-            data = service.spotify.playlist_tracks(self.id, limit=50, offset=offset)
+    def iter_tracks(
+        self, *, window: int = CONFIG.MAX_WORKERS
+    ) -> Iterator[PlaylistTrack]:
+        """Iterate over all the tracks in a playlist, in order.
 
-            self.tracks.extend([PlaylistTrack(track_) for track_ in data])
-            offset += 50
+        The tracks already fetched along with the playlist are yielded first,
+        while the remaining pages are requested concurrently, with at most `window` pages in flight.
+        Tracks are yielded as soon as their page arrives.
 
-        self.total_tracks = len(self.tracks)
-        return self.tracks
+        Parameters
+        ----------
+        window: `int`
+            The maximum number of pages requested at once.
 
-    def add_items(self, items: List[Union[Track, "spotify.Episode", str]]) -> None:
-        from .episode import Episode
+        Returns
+        -------
+        result: `Iterator[PlaylistTrack]`
+            The tracks from the playlist.
+        """
 
-        items = list(
-            map(
-                lambda item: item.id if isinstance(item, (Track, Episode)) else item,
-                items,
+        if self._fully_loaded:
+            yield from self.tracks
+            return
+
+        items = list(self._items)
+        yield from (track for track in items if track is not None)
+
+        pages = iter_offset_pages(
+            lambda offset: service.spotify.playlist_tracks(
+                self.id, limit=_PAGE_SIZE, offset=offset
+            ),
+            total=self.total_tracks,
+            page_size=_PAGE_SIZE,
+            start=len(items),
+            window=window,
+        )
+        for page in pages:
+            for item in page["items"]:
+                track = _track_or_none(item)
+                items.append(track)
+                if track is not None:
+                    yield track
+
+        self._items = items
+        self._save_cached_tracks()
+
+    @property
+    def _fully_loaded(self) -> bool:
+        return len(self._items) >= self.total_tracks
+
+    @staticmethod
+    def _item_uri(item: Union[Track, "spotify.Episode", str]) -> str:
+        if isinstance(item, str):
+            return item if ":" in item else f"spotify:track:{item}"
+        return item.uri
+
+    @staticmethod
+    def _item_models(
+        items: List[Union[Track, "spotify.Episode", str]], uris: List[str]
+    ) -> List[Optional[PlaylistTrack]]:
+        """build playlist tracks for newly added items, fetching the data of the ones given as ids."""
+        from .client import client
+
+        data: Dict[str, Dict] = {
+            item.uri: item._data for item in items if isinstance(item, Track)
+        }
+        for kind in ("track", "episode"):
+            missing = [
+                uri.split(":")[-1]
+                for uri in dict.fromkeys(uris)
+                if uri not in data and uri.startswith(f"spotify:{kind}:")
+            ]
+            pages = map_concurrently(
+                lambda batch: getattr(service.spotify, kind + "s")(batch)[kind + "s"],
+                chunks(missing, 50),
             )
+            for page in pages:
+                data.update((item["uri"], item) for item in page if item)
+
+        added_at = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        return [
+            _track_or_none(
+                {"track": data.get(uri), "added_at": added_at, "added_by": client}
+            )
+            for uri in uris
+        ]
+
+    def _refresh_total(self) -> None:
+        data = service.spotify.playlist(self.id, fields="snapshot_id,tracks.total")
+        self.snapshot_id = data["snapshot_id"]
+        self.total_tracks = data["tracks"]["total"]
+
+    def add_items(
+        self,
+        items: List[Union[Track, "spotify.Episode", str]],
+        position: Optional[int] = None,
+    ) -> None:
+        """Add tracks or episodes (or their ids / URIs) to the playlist.
+
+        The items are added in chunks of 100 (the most the API takes per request), one after the other so they keep their order,
+        while the data of items given as ids is fetched alongside to update the loaded tracks with.
+
+        Parameters
+        ----------
+        items: `List[Union[Track, Episode, str]]`
+            The items to add.
+        position: `Optional[int]`
+            Where in the playlist to insert the items, they're appended by default.
+        """
+        uris = [self._item_uri(item) for item in items]
+        keep_loaded = self._fully_loaded or (
+            position is not None and position <= len(self._items)
+        )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            models = (
+                executor.submit(self._item_models, items, uris) if keep_loaded else None
+            )
+
+            for idx, batch in enumerate(chunks(uris, _WRITE_LIMIT)):
+                result = service.spotify.playlist_add_items(
+                    self.id,
+                    items=batch,
+                    position=(
+                        None if position is None else position + idx * _WRITE_LIMIT
+                    ),
+                )
+                self.snapshot_id = result["snapshot_id"]
+
+            if models is not None:
+                added = models.result()
+                insert_at = len(self._items) if position is None else position
+                self._items[insert_at:insert_at] = added
+        self.total_tracks += len(uris)
+
+        if self._fully_loaded:
+            self._save_cached_tracks()
+
+    def remove_items(self, items: List[Union[Track, "spotify.Episode", str]]) -> None:
+        """Remove every occurrence of the tracks or episodes (or their ids / URIs) from the playlist.
+
+        The items are removed in chunks of 100, with every chunk applied to the snapshot the previous one left.
+        """
+        uris = list(dict.fromkeys(self._item_uri(item) for item in items))
+        fully_loaded = self._fully_loaded
+
+        for batch in chunks(uris, _WRITE_LIMIT):
+            result = service.spotify.playlist_remove_all_occurrences_of_items(
+                self.id, batch, snapshot_id=self.snapshot_id
+            )
+            self.snapshot_id = result["snapshot_id"]
+
+        # the loaded tracks stay the start of the playlist, without the removed ones
+        removed = set(uris)
+        self._items = [
+            track for track in self._items if track is None or track.uri not in removed
+        ]
+        if fully_loaded:
+            self.total_tracks = len(self._items)
+            self._save_cached_tracks()
+        else:
+            # how many occurrences were in the rest of the playlist isn't known
+            self._refresh_total()
+
+    def reorder_items(
+        self, range_start: int, insert_before: int, range_length: int = 1
+    ) -> None:
+        """Move `range_length` items starting at `range_start` to before the item at `insert_before`.
+
+        The whole range is moved with one request, however long it is.
+        """
+        result = service.spotify.playlist_reorder_items(
+            self.id,
+            range_start=range_start,
+            insert_before=insert_before,
+            range_length=range_length,
+            snapshot_id=self.snapshot_id,
         )
-        service.spotify.playlist_add_items(self.id, items=items)
-        if len(self.tracks) == self.total_tracks:
-            self.tracks.extend(items)
-        self.total_tracks += len(items)
+        self.snapshot_id = result["snapshot_id"]
+
+        if self._fully_loaded:
+            moved = self._items[range_start : range_start + range_length]
+            del self._items[range_start : range_start + range_length]
+            if insert_before > range_start:
+                insert_before -= len(moved)
+            self._items[insert_before:insert_before] = moved
+            self._save_cached_tracks()
+        else:
+            # only the loaded tracks before the moved ones are still in place
+            del self._items[min(range_start, insert_before) :]
 
     # def saved(self) -> bool:
     #     from .client import client
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import Dict, List, Union
+from typing import Dict, Iterable, List, Optional, Union
 
-from melodine.utils import Image
+from melodine.utils import Image, fetch_by_ids
 from melodine.base.misc import URIBase
 
 
@@ -32,6 +32,14 @@ class Show(URIBase):
     def from_id(cls, id: str) -> "Show":
         return cls(data=service.spotify.show(id))
 
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> List[Optional["Show"]]:
+        """get many shows at once, in the same order as the given ids.
+
+        ids that don't resolve to a show are `None` in the results.
+        """
+        return fetch_by_ids(cls, service.spotify.shows, "shows", ids, batch_size=50)
+
     @property
     def episodes(self, *, limit: int = 10, offset: int = 0) -> List[Episode]:
         """Get paged results for episodes from a show based on the limit and offset"""
@@ -1,10 +1,11 @@
 import datetime
-from typing import List
+from typing import Iterable, List, Optional
 
+from melodine import configs as CONFIG
 from melodine.services import service
 from melodine.spotify.artist import Artist
 from melodine.spotify.episode import Episode
-from melodine.utils import Image
+from melodine.utils import Image, fetch_by_ids
 from melodine.base.misc import URIBase
 
 from melodine.base.track import TrackBase
@@ -26,10 +27,13 @@ class Track(URIBase):
         "uri",
         "duration",
         "explicit",
-        "artists",
-        "album",
+        "_data",
+        "_album_data",
+        "_artists",
+        "_album",
+        "_images",
         "_url",
-        "images",
+        "_video_id",
     ]
 
     def __new__(cls, data, **kwargs):
@@ -41,15 +45,13 @@ class Track(URIBase):
         return super().__new__(cls)
 
     def __init__(self, data, **kwargs) -> None:
-        from melodine.spotify.album import Album
-
-        self.artists = list(Artist(_artist) for _artist in data.get("artists", []))
-
-        self.album = (
-            Album(data.get("album", {}))
-            if "album" in data
-            else Album(kwargs.get("album", {}))
-        )
+        # the nested models are only built from the raw data once they're accessed,
+        # since most of them never are for long listings
+        self._data = data
+        self._album_data = data["album"] if "album" in data else kwargs.get("album", {})
+        self._artists = None
+        self._album = None
+        self._images = None
 
         self.id = data.get("id", None)  # pylint: disable=invalid-name
         self.name = data.get("name", None)
@@ -58,13 +60,9 @@ class Track(URIBase):
         self.duration = int(data.get("duration_ms") / 1000)
         self.explicit = data.get("explicit", False)
         self._url = []
+        self._video_id = None
 
-        if "images" in data:
-            self.images = [Image(**image) for image in data.get("images", [])]
-        else:
-            self.images = self.album.images.copy()
-
-        self._audio_analysis = {}
+        self._audio_analysis = None
         self._audio_features = {}
 
     def __repr__(self) -> str:
@@ -75,27 +73,74 @@ class Track(URIBase):
     #         service.spotify.search("ritchrd - paris", type="track")["tracks"]["items"][0]
     #     )
 
+    @property
+    def artists(self) -> List[Artist]:
+        if self._artists is None:
+            self._artists = [Artist(artist) for artist in self._data.get("artists", [])]
+        return self._artists
+
+    @property
+    def album(self):
+        if self._album is None:
+            from melodine.spotify.album import Album
+
+            self._album = Album(self._album_data)
+        return self._album
+
+    @property
+    def images(self) -> List[Image]:
+        if self._images is None:
+            if "images" in self._data:
+                self._images = [Image(**image) for image in self._data["images"]]
+            else:
+                self._images = self.album.images.copy()
+        return self._images
+
     @classmethod
     def from_id(cls, id: str) -> "Track":
         return cls(data=service.spotify.track(id))
 
+    @classmethod
+    def from_ids(cls, ids: Iterable[str]) -> List[Optional["Track"]]:
+        """get many tracks at once, in the same order as the given ids.
+
+        ids that don't resolve to a track are `None` in the results.
+        """
+        return fetch_by_ids(cls, service.spotify.tracks, "tracks", ids, batch_size=50)
+
     @property
     def url(self):
-        """porperty getter for the Track URL"""
+        """porperty getter for the Track URL
 
-        if not self._url:
-            video_id = service.ytmusic.search(
-                f"{self.artists[0].name} - {self.name}", filter="songs"
-            )[0]["videoId"]
+        the URL is resolved again once it expires.
+        """
 
-            video_info = service.innertube.player(video_id)
-
-            self._url = service.sign_url(
-                video_info["streamingData"]["adaptiveFormats"][-1]["signatureCipher"]
-            )
+        if self._video_id is None:
+            self._video_id = self._match_video_id()
 
+        self._url = service.stream_url(self._video_id)
         return self._url
 
+    def _match_video_id(self) -> str:
+        """find the track's YouTube Music video, searching for it only if it hasn't been matched confidently before"""
+        from melodine.matches import best_match
+
+        isrc = self._data.get("external_ids", {}).get("isrc")
+        match = service.matches.get(self.id, isrc)
+        if match is not None and match[1] >= CONFIG.MATCH_CONFIDENCE_THRESHOLD:
+            return match[0]
+
+        query = f"{self.artists[0].name} - {self.name}"
+        video_id, confidence = best_match(
+            (artist.name for artist in self.artists),
+            self.name,
+            service.ytmusic.search(query, filter="songs"),
+        )
+        # unconfident matches are still played, but not kept
+        if confidence >= CONFIG.MATCH_CONFIDENCE_THRESHOLD:
+            service.matches.put(self.id, isrc, video_id, confidence)
+        return video_id
+
     def cache_url(self) -> None:
         """just a dummy call to trigger the url fetching"""
         if not self.url:
@@ -121,20 +166,34 @@ class Track(URIBase):
         return [Track(rec) for rec in recs["tracks"]]
 
     def audio_analysis(self):
-        """get audio analysis for a track based on spotify community's listening patterns"""
+        """get audio analysis for a track based on spotify community's listening patterns
+
+        the analysis is a `melodine.spotify.audio.AudioAnalysis`, with it's segments, beats, bars etc. as NumPy arrays.
+        without numpy (an optional dependency), it's the raw analysis `dict` instead.
+        """
         if self._audio_analysis:
             return self._audio_analysis
 
-        self._audio_analysis = service.spotify.audio_analysis(self.id)
+        from melodine.spotify.audio import audio_analysis, has_numpy
+
+        if has_numpy():
+            self._audio_analysis = audio_analysis(self.id)
+        else:
+            self._audio_analysis = service.spotify.audio_analysis(self.id)
         return self._audio_analysis
 
     def audio_features(self):
-        """get audio features for a track based on spotify community's listening patterns"""
+        """get audio features for a track based on spotify community's listening patterns
+
+        see `melodine.spotify.audio_features_batch` for getting them for many tracks at once.
+        """
         if self._audio_features:
             return self._audio_features
 
-        self._audio_analysis = service.spotify.audio_features(self.id)
-        return self.audio_features
+        from melodine.spotify.audio import audio_features
+
+        self._audio_features = audio_features([self.id])[0] or {}
+        return self._audio_features
 
     def add_to_playlist(self, playlist_id) -> None:
         """Add the track to a spotify playlist"""
@@ -156,22 +215,36 @@ class PlaylistTrack(Track):
     same as a normal track, but with some extra attributes
     """
 
-    __slots__ = ["added_by", "added_at"]
+    __slots__ = ["_item", "_added_by", "_added_at"]
 
-    def __init__(self, data, **kwargs) -> None:
-        from melodine.spotify.client import Client
-        from melodine.spotify.user import User
+    # the same track can be in a playlist more than once, added at different times
+    _identity_mapped = False
 
+    def __init__(self, data, **kwargs) -> None:
         super().__init__(data["track"])
 
-        self.added_by = (
-            User(data.get("added_by"))
-            if not isinstance(data.get("added_by"), (Client, User))
-            else data.get("added_by")
-        )
-        self.added_at = datetime.datetime.strptime(
-            data["added_at"], "%Y-%m-%dT%H:%M:%SZ"
-        )
+        self._item = data
+        self._added_by = None
+        self._added_at = None
+
+    @property
+    def added_by(self):
+        if self._added_by is None:
+            from melodine.spotify.user import User
+
+            # `Client` is wrapped by `singleton` and can't be used with `isinstance`,
+            # so check for the raw user data instead
+            added_by = self._item.get("added_by")
+            self._added_by = User(added_by) if isinstance(added_by, dict) else added_by
+        return self._added_by
+
+    @property
+    def added_at(self) -> datetime.datetime:
+        if self._added_at is None:
+            self._added_at = datetime.datetime.strptime(
+                self._item["added_at"], "%Y-%m-%dT%H:%M:%SZ"
+            )
+        return self._added_at
 
     def __repr__(self):
         return f"<spotify.PlaylistTrack: {self.name!r}>"
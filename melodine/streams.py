@@ -0,0 +1,82 @@
+"""
+a cache for resolved (signed) stream URLs.
+
+resolving a stream URL takes a request to the innertube player endpoint and deciphering it's signature,
+while the resolved URL stays valid for hours (`streamingData.expiresInSeconds`).
+so resolved URLs are kept in memory and on disk under `CACHE_PATH`,
+where other processes and later runs can reuse them for as long as they're valid.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from melodine import configs as CONFIG
+from melodine.utils import atomic_path
+
+# URLs are treated as expired this many seconds early,
+# so one doesn't run out right after being handed out
+EXPIRY_MARGIN = 60
+
+
+class StreamURLCache:
+    def __init__(self, path: str = os.path.join(CONFIG.CACHE_PATH, "streams")) -> None:
+        self.path = path
+        self._urls: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(video_id: str, stream_format: str) -> str:
+        return f"{video_id}-{stream_format}"
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, video_id: str, stream_format: str) -> Optional[str]:
+        """get a still valid URL for a video's stream format, if there's one."""
+        key = self._key(video_id, stream_format)
+
+        with self._lock:
+            entry = self._urls.get(key)
+        if entry is None:
+            try:
+                with open(self._file(key), "r", encoding="utf-8") as cached:
+                    data = json.load(cached)
+                entry = (data["url"], data["expires_at"])
+            except (OSError, ValueError, KeyError):
+                return None
+
+        url, expires_at = entry
+        if time.time() >= expires_at - EXPIRY_MARGIN:
+            self.discard(video_id, stream_format)
+            return None
+
+        with self._lock:
+            self._urls[key] = entry
+        return url
+
+    def put(
+        self, video_id: str, stream_format: str, url: str, expires_in: float
+    ) -> None:
+        """remember a resolved URL for `expires_in` seconds"""
+        key = self._key(video_id, stream_format)
+        expires_at = time.time() + expires_in
+
+        with self._lock:
+            self._urls[key] = (url, expires_at)
+
+        os.makedirs(self.path, exist_ok=True)
+        with atomic_path(self._file(key)) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as cached:
+                json.dump({"url": url, "expires_at": expires_at}, cached)
+
+    def discard(self, video_id: str, stream_format: str) -> None:
+        key = self._key(video_id, stream_format)
+        with self._lock:
+            self._urls.pop(key, None)
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
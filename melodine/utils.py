@@ -1,8 +1,33 @@
+import contextlib
 import functools
+import itertools
+import os
 import re
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, FrozenSet, List, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from melodine import configs as CONFIG
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 # see https://stackoverflow.com/a/63658478/15146028
@@ -35,19 +60,223 @@ class Image:
 def singleton(cls):
     """class definitions marked singleton remember created instances and return that one same instance each time its object is instantialted.
 
-    i.e. only one instance of an object can exist at any given time.
+    i.e. only one instance of an object can exist at any given time,
+    even when several threads instantiate it at once.
     """
 
+    lock = threading.Lock()
+
     @functools.wraps(cls)
     def wrapper_singleton(*args, **kwargs):
-        if not wrapper_singleton.instance:
-            wrapper_singleton.instance = cls(*args, **kwargs)
+        if wrapper_singleton.instance is None:
+            with lock:
+                if wrapper_singleton.instance is None:
+                    wrapper_singleton.instance = cls(*args, **kwargs)
         return wrapper_singleton.instance
 
     wrapper_singleton.instance = None
     return wrapper_singleton
 
 
+class LazyProxy:
+    """stands in for an object that is only constructed the first time one of its attributes is used.
+
+    useful for module level instances whose construction does I/O (like authenticating),
+    which then doesn't have to happen just because the module got imported.
+    """
+
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get_instance(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get_instance(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(self._get_instance())
+
+    def __str__(self) -> str:
+        return str(self._get_instance())
+
+    def __eq__(self, __o: object) -> bool:
+        return self._get_instance() == __o
+
+    def __hash__(self) -> int:
+        return hash(self._get_instance())
+
+    def __bool__(self) -> bool:
+        return bool(self._get_instance())
+
+
+def chunks(items: Sequence[T], size: int) -> List[Sequence[T]]:
+    """split a sequence into consecutive chunks of (at most) `size` items"""
+    return [items[idx : idx + size] for idx in range(0, len(items), size)]
+
+
+def map_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = CONFIG.MAX_WORKERS,
+) -> List[R]:
+    """call `func` on every item from a pool of threads, returning the results in the same order.
+
+    meant for I/O bound calls, like fetching many batches from an API at once.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def fetch_by_ids(
+    cls: Callable[[Dict], R],
+    endpoint: Callable[[Sequence[str]], Dict],
+    key: str,
+    ids: Iterable[str],
+    batch_size: int,
+) -> List[Optional[R]]:
+    """get many objects at once from one of the API's batch endpoints, in the same order as the given ids.
+
+    the ids are requested in batches of `batch_size` (the most the endpoint allows per request),
+    with the batches being requested concurrently.
+    every item of the response's `key` list is built with `cls`,
+    and ids that don't resolve to anything are `None` in the results.
+    """
+    pages = map_concurrently(
+        lambda batch: endpoint(batch)[key], chunks(list(ids), batch_size)
+    )
+    return [cls(data) if data else None for page in pages for data in page]
+
+
+def iter_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    ordered: bool = True,
+    window: int = CONFIG.MAX_WORKERS,
+    return_exceptions: bool = False,
+) -> Iterator[Tuple[T, Union[R, BaseException]]]:
+    """call `func` on every item from a pool of threads, yielding `(item, result)` pairs.
+
+    the pairs come in the same order as the items when `ordered`,
+    or as soon as each call finishes otherwise. at most `window` calls are in flight at once.
+    a call raising stops the iteration with it's exception,
+    unless `return_exceptions`, in which case the exception is yielded as the item's result instead.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, window)) as executor:
+        pending = deque(
+            (item, executor.submit(func, item))
+            for item in itertools.islice(items, window)
+        )
+        try:
+            while pending:
+                if ordered:
+                    item, future = pending.popleft()
+                else:
+                    done = wait(
+                        [future for _, future in pending], return_when=FIRST_COMPLETED
+                    ).done
+                    idx = next(
+                        idx for idx, (_, future) in enumerate(pending) if future in done
+                    )
+                    item, future = pending[idx]
+                    del pending[idx]
+
+                try:
+                    result = future.result()
+                except Exception as error:  # pylint: disable=broad-except
+                    if not return_exceptions:
+                        raise
+                    result = error
+                for next_item in itertools.islice(items, 1):
+                    pending.append((next_item, executor.submit(func, next_item)))
+                yield item, result
+        finally:
+            # when the consumer stops early, don't bother with calls not yet started
+            for _, future in pending:
+                future.cancel()
+
+
+def normalize_query(query: str) -> str:
+    """normalize a search query, so queries differing only in case and whitespace are the same"""
+    return " ".join(query.casefold().split())
+
+
+@contextlib.contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """a temporary path to write a file (or directory) at, which gets moved to `path` once written.
+
+    other processes (and threads) only ever see the old entry or the whole new one, never a partial one.
+    the temporary entry is removed if writing it (or moving it) fails.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
+        else:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+        raise
+
+
+def iter_offset_pages(
+    fetch_page: Callable[[int], R],
+    total: int,
+    page_size: int,
+    start: int = 0,
+    window: int = CONFIG.MAX_WORKERS,
+) -> Iterator[R]:
+    """fetch the pages of an offset paginated listing concurrently, yielding them in order.
+
+    `fetch_page` gets called with the offset of each page from `start` up to `total`.
+    at most `window` pages are in flight at once, and a page is yielded as soon as it
+    (and every page before it) has arrived, so the first results can be used right away.
+    """
+    for _, page in iter_concurrently(
+        fetch_page, range(start, total, page_size), window=window
+    ):
+        yield page
+
+
+def iter_paginated(
+    fetch_page: Callable[[int], Dict[str, Any]],
+    page_size: int,
+    window: int = CONFIG.MAX_WORKERS,
+) -> Iterator[Dict[str, Any]]:
+    """fetch every page of an offset paginated listing (with a `total`), yielding them in order.
+
+    the first page is fetched on it's own to learn the `total`,
+    after which the remaining pages are fetched concurrently through `iter_offset_pages`.
+    """
+    first_page = fetch_page(0)
+    yield first_page
+    yield from iter_offset_pages(
+        fetch_page,
+        total=first_page["total"],
+        page_size=page_size,
+        start=page_size,
+        window=window,
+    )
+
+
 class CacheStrategy(Enum):
     NONE: bool = False
     MODERATE: None = None
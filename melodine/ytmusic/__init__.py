@@ -4,7 +4,7 @@ from melodine.ytmusic.views._playlist import Playlist
 from melodine.ytmusic.views._track import Track
 from melodine.ytmusic.views._video import Video
 from melodine.ytmusic.views.album import YTMusicAlbum
-from melodine.ytmusic.views.search import search
+from melodine.ytmusic.views.search import search, search_many
 from melodine.ytmusic.views.user import User
 
 __all__ = [
@@ -16,4 +16,5 @@ __all__ = [
     "User",
     "Playlist",
     "search",
+    "search_many",
 ]
@@ -26,6 +26,7 @@ class Track(URIBase):
         "_artists",
         "_album",
         "_url",
+        "_video_id",
         "_recs",
         "_recs_offset",
     ]
@@ -67,6 +68,7 @@ class Track(URIBase):
         self._album: Dict = album
 
         self._url = str()
+        self._video_id = None
         self._recs = list()
         self._recs_offset = int()  # aka 0
 
@@ -102,23 +104,16 @@ class Track(URIBase):
     def url(self) -> str:
         """fetch the playback url for the track."""
 
-        if not self._url:
-            video_id = (
-                service.ytmusic.search(
+        if self._video_id is None:
+            self._video_id = (
+                self.id
+                or service.ytmusic.search(
                     f"{self.artists[0].name} - {self.name}", filter="songs"
                 )[0]["videoId"]
-                if not self.id
-                else self.id
-            )
-
-            video_info = service.innertube.player(video_id)
-
-            # print(video_info['streamingData']['expiresInSeconds'])
-            # print(video_info['streamingData']['formats'][0].keys())
-            self._url = service.sign_url(
-                video_info["streamingData"]["adaptiveFormats"][-1]["signatureCipher"]
             )
 
+        # cached by the service until it expires, and resolved again after that
+        self._url = service.stream_url(self._video_id)
         return self._url
 
     def cache_url(self) -> None:
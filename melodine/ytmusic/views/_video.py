@@ -144,14 +144,8 @@ class Video(URIBase):
 
         retrieves the higest quality adaptive track URL by default
         """
-        if self._url:
-            return self._url
-
-        video_info = service.innertube.player(self.id)
-        self._url = service.sign_url(
-            video_info["streamingData"]["adaptiveFormats"][-1]["signatureCipher"]
-        )
-
+        # cached by the service until it expires, and resolved again after that
+        self._url = service.stream_url(self.id)
         return self._url
 
     def cache_url(self) -> None:
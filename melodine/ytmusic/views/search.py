@@ -1,13 +1,19 @@
-from typing import Iterable, Literal
+import functools
+from typing import Iterable, Iterator, Literal, Tuple, Union
 
 import dacite
 
+from melodine import configs as CONFIG
 from melodine.services import service
+from melodine.utils import iter_concurrently, normalize_query
 from melodine.ytmusic.models.search_result_model import YTMusicSearchResults
 from melodine.ytmusic.utils import model_search_results
 
 _SEARCH_TYPES = {"artists", "albums", "tracks", "videos", "playlists"}
 
+# how many (normalized) queries `search_many` keeps the results of
+_CACHE_SIZE = 1024
+
 
 def search(
     q: str,
@@ -84,3 +90,35 @@ def search(
     return dacite.from_dict(
         data_class=YTMusicSearchResults, data=modeled_search_results
     )
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _search_cached(q: str, types: Tuple[str, ...], limit: int) -> YTMusicSearchResults:
+    return search(q, types=types, limit=limit)
+
+
+def search_many(
+    queries: Iterable[str],
+    types: Iterable[
+        Literal["tracks", "songs", "videos", "albums", "artists", "playlists"]
+    ] = [],
+    limit: int = 20,
+    ordered: bool = True,
+    window: int = CONFIG.MAX_WORKERS,
+) -> Iterator[Tuple[str, Union[YTMusicSearchResults, Exception]]]:
+    """
+    get search results for many queries at once, as `(query, results)` pairs.
+    the queries are searched concurrently (at most `window` at once, under the shared rate limit),
+    and the results are reused for queries differing only in case and whitespace.
+    the pairs are yielded in the same order as the queries when `ordered`, or as soon as each one arrives otherwise.
+    a query whose search fails is paired with the exception instead of it's results,
+    so one failure doesn't stop the rest of the queries.
+    """
+    types = tuple(sorted(set(types)))
+    return iter_concurrently(
+        lambda query: _search_cached(normalize_query(query), types, limit),
+        queries,
+        ordered=ordered,
+        window=window,
+        return_exceptions=True,
+    )
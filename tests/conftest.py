@@ -0,0 +1,24 @@
+import pytest
+
+from melodine import configs as CONFIG
+from melodine.services import service
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path, monkeypatch):
+    """keep everything written under `APP_DIR` / `CACHE_PATH` in a temporary directory"""
+    monkeypatch.setattr(CONFIG, "APP_DIR", str(tmp_path))
+    monkeypatch.setattr(CONFIG, "CACHE_PATH", str(tmp_path / ".cache"))
+    monkeypatch.setattr(service.config.spotify_creds, "app_path", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def patch_service(monkeypatch):
+    """replace one of the backend clients of `service` with a stand-in"""
+
+    def patch(name, client):
+        monkeypatch.setattr(type(service), name, property(lambda self: client))
+        return client
+
+    return patch
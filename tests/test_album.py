@@ -0,0 +1,74 @@
+from melodine.spotify.album import Album
+
+ARTIST = {"id": "ar", "uri": "spotify:artist:ar", "name": "artist", "external_urls": {}}
+
+
+def track(idx):
+    return {
+        "id": f"t{idx}",
+        "uri": f"spotify:track:t{idx}",
+        "name": f"track {idx}",
+        "duration_ms": 1000,
+        "artists": [ARTIST],
+    }
+
+
+class FakeSpotify:
+    def __init__(self, total):
+        self.total = total
+        self.requests = []
+
+    def album_tracks(self, id, limit=20, offset=0):
+        self.requests.append((offset, limit))
+        return {
+            "items": [
+                track(idx) for idx in range(offset, min(offset + limit, self.total))
+            ],
+            "total": self.total,
+        }
+
+
+def album(total, embedded):
+    return Album(
+        {
+            "id": f"al{total}",
+            "uri": f"spotify:album:al{total}",
+            "name": "album",
+            "external_urls": {"spotify": f"https://open.spotify.com/album/al{total}"},
+            "release_date": "2020-01-01",
+            "artists": [ARTIST],
+            "total_tracks": total,
+            "tracks": {
+                "items": [track(idx) for idx in range(embedded)],
+                "total": total,
+            },
+        }
+    )
+
+
+def test_tracks_are_served_from_the_embedded_page(patch_service):
+    spotify = patch_service("spotify", FakeSpotify(12))
+    album_ = album(12, embedded=12)
+
+    assert [track.id for track in album_.tracks] == [f"t{idx}" for idx in range(12)]
+    assert [track.id for track in album_.get_tracks(limit=5, offset=10)] == [
+        "t10",
+        "t11",
+    ]
+    assert spotify.requests == []
+
+
+def test_tracks_only_requests_the_pages_past_the_embedded_one(patch_service):
+    spotify = patch_service("spotify", FakeSpotify(180))
+    album_ = album(180, embedded=50)
+
+    assert [track.id for track in album_.get_tracks(limit=20, offset=30)] == [
+        f"t{idx}" for idx in range(30, 50)
+    ]
+    assert spotify.requests == []
+    assert len(album_.get_tracks(limit=20, offset=60)) == 20
+    assert spotify.requests == [(60, 20)]
+    spotify.requests.clear()
+
+    assert [track.id for track in album_.tracks] == [f"t{idx}" for idx in range(180)]
+    assert sorted(spotify.requests) == [(50, 50), (100, 50), (150, 50)]
@@ -0,0 +1,67 @@
+from melodine.spotify.artist import Artist
+
+
+def album(idx):
+    return {
+        "id": f"a{idx}",
+        "uri": f"spotify:album:a{idx}",
+        "name": f"album {idx}",
+        "external_urls": {"spotify": f"https://open.spotify.com/album/a{idx}"},
+        "release_date": "2020-01-01",
+        "artists": [
+            {
+                "id": "ar",
+                "uri": "spotify:artist:ar",
+                "name": "artist",
+                "external_urls": {},
+            }
+        ],
+    }
+
+
+class FakeSpotify:
+    def __init__(self, discography):
+        self.discography = discography
+        self.requests = []
+
+    def artist_albums(self, id, include_groups=None, limit=20, offset=0):
+        self.requests.append((include_groups, offset))
+        albums = self.discography[include_groups]
+        return {
+            "items": [album(idx) for idx in albums[offset : offset + limit]],
+            "total": len(albums),
+        }
+
+
+def test_get_all_albums_drops_albums_listed_more_than_once(patch_service):
+    spotify = patch_service(
+        "spotify",
+        FakeSpotify(
+            {
+                "album": list(range(120)),
+                "single": [200, 201, 5],
+                "appears_on": [300, 200, 301],
+                "compilation": [],
+            }
+        ),
+    )
+    artist = Artist({"id": "ar", "uri": "spotify:artist:ar", "external_urls": {}})
+
+    albums = artist.get_all_albums()
+
+    assert [album.id for album in albums] == [
+        *(f"a{idx}" for idx in range(120)),
+        "a200",
+        "a201",
+        "a300",
+        "a301",
+    ]
+    # every page is requested once, the total coming with the first one
+    assert sorted(spotify.requests) == [
+        ("album", 0),
+        ("album", 50),
+        ("album", 100),
+        ("appears_on", 0),
+        ("compilation", 0),
+        ("single", 0),
+    ]
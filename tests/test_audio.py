@@ -0,0 +1,157 @@
+import pytest
+
+from melodine.spotify import audio
+from melodine.spotify.audio import (
+    AudioAnalysis,
+    audio_analysis,
+    audio_features,
+    audio_features_batch,
+)
+from melodine.spotify.track import Track
+
+
+def segment(idx):
+    return {
+        "start": idx * 0.5,
+        "duration": 0.5,
+        "confidence": 0.9,
+        "loudness_start": -20.0,
+        "loudness_max_time": 0.1,
+        "loudness_max": -10.0,
+        "loudness_end": -30.0,
+        "pitches": [idx / 12] * 12,
+        "timbre": [float(idx)] * 12,
+    }
+
+
+def analysis(segments=3):
+    return {
+        "track": {"tempo": 120.0, "key": 5},
+        "segments": [segment(idx) for idx in range(segments)],
+        "sections": [{"start": 0.0, "duration": 1.5, "tempo": 120.0, "key": 5}],
+        "beats": [
+            {"start": idx * 0.5, "duration": 0.5, "confidence": 1.0} for idx in range(3)
+        ],
+        "bars": [],
+        "tatums": [],
+    }
+
+
+def features(id):
+    return {"id": id, **{feature: float(id[1:]) for feature in audio.FEATURES}}
+
+
+class FakeSpotify:
+    def __init__(self, featureless=()):
+        self.analysed = []
+        self.batches = []
+        self.featureless = set(featureless)
+
+    def audio_analysis(self, id):
+        self.analysed.append(id)
+        return analysis()
+
+    def audio_features(self, ids):
+        self.batches.append(list(ids))
+        return [None if id in self.featureless else features(id) for id in ids]
+
+
+@pytest.fixture
+def spotify(patch_service, app_dir, monkeypatch):
+    monkeypatch.setattr(audio, "ANALYSIS_PATH", str(app_dir / "audio-analysis"))
+    monkeypatch.setattr(audio, "_features", {})
+    return patch_service("spotify", FakeSpotify())
+
+
+def test_analysis_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    result = AudioAnalysis.from_data(analysis())
+
+    assert result.track == {"tempo": 120.0, "key": 5}
+    assert result.segments.dtype.names == audio.SEGMENT_FIELDS
+    assert result.pitches.shape == result.timbre.shape == (3, 12)
+    assert result.pitches.dtype == numpy.float32
+    assert list(result.beats["start"]) == [0.0, 0.5, 1.0]
+    # fields missing from the response are `nan`
+    assert numpy.isnan(result.sections["loudness"][0])
+    assert len(result.bars) == 0
+
+
+def test_analysis_without_segments():
+    pytest.importorskip("numpy")
+
+    result = AudioAnalysis.from_data(analysis(segments=0))
+
+    assert len(result.segments) == 0
+    assert result.pitches.shape == result.timbre.shape == (0, 12)
+
+
+def test_saved_analyses_load_memory_mapped(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    result = AudioAnalysis.from_data(analysis())
+
+    result.save(str(tmp_path / "track"))
+    loaded = AudioAnalysis.load(str(tmp_path / "track"))
+
+    assert loaded.track == result.track
+    for name in AudioAnalysis.ARRAYS:
+        assert isinstance(getattr(loaded, name), numpy.memmap)
+        # compared as bytes, since `nan` fields never compare equal
+        assert getattr(loaded, name).dtype == getattr(result, name).dtype
+        assert getattr(loaded, name).tobytes() == getattr(result, name).tobytes()
+
+
+def test_analyses_are_only_requested_once(spotify):
+    pytest.importorskip("numpy")
+
+    first = audio_analysis("t1")
+    second = audio_analysis("t1")
+
+    assert spotify.analysed == ["t1"]
+    assert second.pitches.tolist() == first.pitches.tolist()
+
+
+def test_track_analysis_is_the_raw_response_without_numpy(spotify, monkeypatch):
+    monkeypatch.setattr(audio, "has_numpy", lambda: False)
+    track = Track(
+        {
+            "id": "t2",
+            "uri": "spotify:track:t2",
+            "name": "track",
+            "duration_ms": 1000,
+            "artists": [],
+        }
+    )
+
+    assert track.audio_analysis() == analysis()
+
+
+def test_features_are_requested_in_batches_of_100(spotify):
+    ids = [f"t{idx}" for idx in range(250)]
+
+    results = audio_features(ids)
+
+    assert sorted(len(batch) for batch in spotify.batches) == [50, 100, 100]
+    assert [result["id"] for result in results] == ids
+
+
+def test_features_are_only_requested_once(spotify):
+    audio_features(["t1", "t2"])
+    results = audio_features(["t3", "t1", "t3", "t2"])
+
+    assert spotify.batches == [["t1", "t2"], ["t3"]]
+    assert [result["id"] for result in results] == ["t3", "t1", "t3", "t2"]
+
+
+def test_features_batch_rows_are_nan_without_features(spotify):
+    numpy = pytest.importorskip("numpy")
+    spotify.featureless.add("t2")
+
+    array = audio_features_batch(["t1", "t2", "t3"])
+
+    assert audio_features(["t2"]) == [None]
+    assert array.dtype.names == ("id", *audio.FEATURES)
+    assert array["id"].tolist() == ["t1", "t2", "t3"]
+    assert array["tempo"][[0, 2]].tolist() == [1.0, 3.0]
+    assert all(numpy.isnan(array[1][feature]) for feature in audio.FEATURES)
@@ -0,0 +1,87 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from melodine.services import Transport, service
+
+PLAYER_URL = "https://music.youtube.com/s/player/{}/player_ias.vflset/en_US/base.js"
+
+
+class FakeYTMusic:
+    def __init__(self):
+        self.version = "4fcd6e4a"
+
+    def get_basejs_url(self):
+        return PLAYER_URL.format(self.version)
+
+
+class FakeSession:
+    def __init__(self):
+        self.fetched = []
+
+    def get(self, url, timeout=None):
+        self.fetched.append(url)
+        return SimpleNamespace(text=f"// the player script from {url}")
+
+
+@pytest.fixture
+def ytmusic(patch_service):
+    return patch_service("ytmusic", FakeYTMusic())
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(Transport, "session", property(lambda self: session))
+    return session
+
+
+@pytest.fixture
+def services(app_dir):
+    # built after `APP_DIR` is patched, so the scripts are stored under it
+    return type(service)()
+
+
+def test_unchanged_version_is_only_downloaded_once(services, ytmusic, session):
+    assert services.refresh_basejs()
+    assert not services.refresh_basejs()
+
+    assert session.fetched == [PLAYER_URL.format("4fcd6e4a")]
+    assert services.basejs == "// the player script from " + PLAYER_URL.format(
+        "4fcd6e4a"
+    )
+
+
+def test_version_change_downloads_the_new_script_and_prunes_the_old(
+    services, ytmusic, session
+):
+    services.refresh_basejs()
+    services.basejs
+
+    ytmusic.version = "b2e1a5c0"
+    assert services.refresh_basejs()
+
+    assert sorted(os.listdir(services._base_js_dir)) == ["b2e1a5c0.js", "latest.json"]
+    assert services._read_latest_basejs()["version"] == "b2e1a5c0"
+    assert services.basejs.endswith(PLAYER_URL.format("b2e1a5c0"))
+
+
+def test_pruning_ignores_scripts_removed_by_another_process(
+    services, ytmusic, session, monkeypatch
+):
+    services.refresh_basejs()
+    stale_path = os.path.join(services._base_js_dir, "0000aaaa.js")
+    open(stale_path, "w").close()
+
+    remove = os.remove
+
+    def racing_remove(path):
+        # another process prunes the same script first
+        remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "remove", racing_remove)
+    services._prune_basejs(keep="4fcd6e4a")
+
+    assert sorted(os.listdir(services._base_js_dir)) == ["4fcd6e4a.js", "latest.json"]
@@ -0,0 +1,107 @@
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from melodine.cipher import Cipher
+from melodine.services import service
+
+# a small plan in the shape `Cipher.to_plan` extracts from base.js
+PLAN = {
+    "transform_plan": ["DE.AJ(a,15)", "DE.VR(a,3)", "DE.kT(a,51)", "DE.AJ(a,2)"],
+    "transform_map": {"AJ": "reverse", "VR": "splice", "kT": "swap"},
+    "throttling_plan": [
+        ["0", "1"],
+        ["2", "1", "3"],
+        ["4", "1", "5"],
+        ["7", "1", "8"],
+        ["10", "1", "9"],
+        ["4", "6", "5"],
+    ],
+    "throttling_array": [
+        {"function": "throttling_reverse"},
+        "b",
+        {"function": "throttling_swap"},
+        3,
+        {"function": "throttling_push"},
+        "z",
+        {"self": True},
+        {"function": "throttling_unshift"},
+        2,
+        "kX3q-_Lm",
+        {"function": "throttling_cipher_function"},
+    ],
+}
+
+SIGNATURE = "AOq0QJ8wRAIgT3cNNKnN0K8tj8pBdRyY6hGyhbPQgUR-sQx3Kd8s9QkCIC-0LyGU"
+N = "mVkK7Xx1PAKDWcmT"
+
+
+@pytest.fixture
+def cipher():
+    return Cipher.from_plan(json.loads(json.dumps(PLAN)))
+
+
+def test_plan_round_trips(cipher):
+    plan = json.loads(json.dumps(cipher.to_plan()))
+    rebuilt = Cipher.from_plan(plan)
+
+    assert plan == PLAN
+    assert rebuilt.get_signature(SIGNATURE) == cipher.get_signature(SIGNATURE)
+    assert rebuilt.calculate_n(N) == cipher.calculate_n(N)
+    assert cipher.get_signature(SIGNATURE) != SIGNATURE
+    assert cipher.calculate_n(N) != N
+
+
+def test_every_n_is_calculated_from_the_pristine_array(cipher):
+    array = copy.copy(cipher.throttling_array)
+    ns = [N, "Zq8_Yt2-aBcDeFgH", N[::-1], "0123456789abcdef"]
+    # what a cipher that has never calculated anything else gives for each n
+    expected = [Cipher.from_plan(PLAN).calculate_n(n) for n in ns]
+
+    assert [cipher.calculate_n(n) for n in ns] == expected
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(cipher._transform_n, ns * 50))
+
+    assert results == expected * 50
+    assert len(set(expected)) == len(ns)
+    assert cipher.throttling_array == array
+    assert cipher.throttling_array[6] is cipher.throttling_array
+
+
+class CountingCipher:
+    built = 0
+
+    def __init__(self, js):
+        type(self).built += 1
+        self.js = js
+
+    def to_plan(self):
+        return {"js": self.js}
+
+    @classmethod
+    def from_plan(cls, plan):
+        cipher = cls.__new__(cls)
+        cipher.js = plan["js"]
+        return cipher
+
+
+def test_plans_are_reused_and_stale_ones_pruned(app_dir, monkeypatch):
+    services = type(service)()
+    monkeypatch.setattr(CountingCipher, "built", 0)
+    os.makedirs(services._cipher_plans_dir)
+    stale = os.path.join(services._cipher_plans_dir, "0" * 40 + ".json")
+    open(stale, "w").close()
+
+    services._base_js_content = "// player one"
+    services._load_cipher(CountingCipher)
+    assert services._load_cipher(CountingCipher).js == "// player one"
+    assert CountingCipher.built == 1
+    assert len(os.listdir(services._cipher_plans_dir)) == 1
+
+    services._base_js_content = "// player two"
+    assert services._load_cipher(CountingCipher).js == "// player two"
+    assert CountingCipher.built == 2
+    assert len(os.listdir(services._cipher_plans_dir)) == 1
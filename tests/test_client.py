@@ -0,0 +1,187 @@
+import importlib
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# `melodine.spotify.client` is shadowed by the client it exports
+client_module = importlib.import_module("melodine.spotify.client")
+
+
+class FakeSpotify:
+    def __init__(self, user_id: str) -> None:
+        self.user_id = user_id
+        self.calls = 0
+
+    def current_user(self):
+        self.calls += 1
+        return {
+            "id": self.user_id,
+            "display_name": self.user_id,
+            "uri": f"spotify:user:{self.user_id}",
+        }
+
+
+def album(idx):
+    artist = {
+        "id": "ar",
+        "uri": "spotify:artist:ar",
+        "name": "artist",
+        "external_urls": {"spotify": "https://open.spotify.com/artist/ar"},
+    }
+    return {
+        "id": f"a{idx}",
+        "uri": f"spotify:album:a{idx}",
+        "name": f"album {idx}",
+        "external_urls": {"spotify": f"https://open.spotify.com/album/a{idx}"},
+        "release_date": "2020-01-01",
+        "artists": [artist],
+    }
+
+
+class FakeLibrarySpotify(FakeSpotify):
+    """answers the saved `{kind}` endpoints from a set of saved ids"""
+
+    def __init__(self, user_id: str, saved=()) -> None:
+        super().__init__(user_id)
+        self.saved = set(saved)
+        self.requests = []
+        self.offsets = []
+
+    def current_user_saved_albums(self, limit=20, offset=0):
+        self.offsets.append(offset)
+        # later pages come back first, so the listing has to put them back in order
+        time.sleep(0.002 * (250 - offset) / limit)
+        items = [
+            {"album": album(idx)} for idx in range(offset, min(offset + limit, 230))
+        ]
+        return {"items": items, "total": 230}
+
+    def __getattr__(self, name):
+        prefix = "current_user_saved_"
+        if not name.startswith(prefix):
+            raise AttributeError(name)
+        kind, action = name[len(prefix) :].rsplit("_", 1)
+
+        def endpoint(ids):
+            self.requests.append((kind, action, list(ids)))
+            if action == "contains":
+                return [id in self.saved for id in ids]
+            if action == "add":
+                self.saved.update(ids)
+            else:
+                self.saved.difference_update(ids)
+
+        return endpoint
+
+    def sizes(self, kind, action):
+        return sorted(
+            len(ids)
+            for kind_, action_, ids in self.requests
+            if (kind_, action_) == (kind, action)
+        )
+
+
+def sign_in(app_dir, refresh_token: str) -> None:
+    (app_dir / "spotify-cache").write_text(
+        json.dumps({"access_token": "a", "refresh_token": refresh_token})
+    )
+
+
+def test_profile_is_reused_for_the_same_account(app_dir, patch_service, monkeypatch):
+    monkeypatch.setattr(client_module, "_PROFILE_PATH", str(app_dir / "profile.json"))
+    spotify = patch_service("spotify", FakeSpotify("first"))
+    sign_in(app_dir, "token-1")
+
+    assert client_module._current_user()["id"] == "first"
+    assert client_module._current_user()["id"] == "first"
+    assert spotify.calls == 1
+
+
+def test_profile_is_refetched_after_switching_accounts(
+    app_dir, patch_service, monkeypatch
+):
+    monkeypatch.setattr(client_module, "_PROFILE_PATH", str(app_dir / "profile.json"))
+    patch_service("spotify", FakeSpotify("first"))
+    sign_in(app_dir, "token-1")
+    client_module._current_user()
+
+    patch_service("spotify", FakeSpotify("second"))
+    sign_in(app_dir, "token-2")
+
+    assert client_module._current_user()["id"] == "second"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(client_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def library(app_dir, patch_service, monkeypatch, clock):
+    monkeypatch.setattr(client_module, "_PROFILE_PATH", str(app_dir / "profile.json"))
+    # the client is a singleton, start each test from a fresh one
+    monkeypatch.setattr(client_module.Client, "instance", None)
+    spotify = patch_service("spotify", FakeLibrarySpotify("me", saved={"t1", "a1"}))
+    sign_in(app_dir, "token-1")
+    return client_module.Client(), spotify
+
+
+def test_library_checks_in_batches_the_endpoints_take(library):
+    client, spotify = library
+
+    client.are_tracks_saved([f"t{idx}" for idx in range(120)])
+    client.are_albums_saved([f"a{idx}" for idx in range(45)])
+
+    assert spotify.sizes("tracks", "contains") == [20, 50, 50]
+    assert spotify.sizes("albums", "contains") == [5, 20, 20]
+
+
+def test_library_asks_once_per_id(library):
+    client, spotify = library
+
+    assert client.are_tracks_saved(["t1", "t2", "t1"]) == {"t1": True, "t2": False}
+    assert client.is_track_saved("t2") is False
+    assert spotify.requests == [("tracks", "contains", ["t1", "t2"])]
+
+
+def test_library_rechecks_after_the_cache_expires(library, clock, monkeypatch):
+    monkeypatch.setattr(client_module.CONFIG, "LIBRARY_CACHE_TTL", 60)
+    client, spotify = library
+    client.is_track_saved("t1")
+
+    clock.now += 59
+    client.is_track_saved("t1")
+    assert len(spotify.requests) == 1
+
+    spotify.saved.discard("t1")
+    clock.now += 2
+    assert client.is_track_saved("t1") is False
+    assert len(spotify.requests) == 2
+
+
+def test_saving_and_unsaving_update_the_cache(library):
+    client, spotify = library
+    client.are_albums_saved(["a1", "a2"])
+
+    client.save_albums(["a2", "a2"])
+    client.unsave_albums(["a1"])
+
+    assert client.are_albums_saved(["a1", "a2"]) == {"a1": False, "a2": True}
+    assert spotify.requests == [
+        ("albums", "contains", ["a1", "a2"]),
+        ("albums", "add", ["a2"]),
+        ("albums", "delete", ["a1"]),
+    ]
+
+
+def test_iter_listings_keep_the_order_of_the_pages(library):
+    client, spotify = library
+
+    albums = list(client.iter_saved_albums(window=4))
+
+    assert [album.id for album in albums] == [f"a{idx}" for idx in range(230)]
+    assert sorted(spotify.offsets) == [0, 50, 100, 150, 200]
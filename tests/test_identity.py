@@ -0,0 +1,95 @@
+from melodine.spotify.album import Album
+from melodine.spotify.artist import Artist
+from melodine.spotify.track import Track
+
+
+def artist():
+    return {
+        "id": "ar1",
+        "uri": "spotify:artist:ar1",
+        "name": "artist",
+        "external_urls": {"spotify": "https://open.spotify.com/artist/ar1"},
+    }
+
+
+def simplified_album():
+    return {
+        "id": "al1",
+        "uri": "spotify:album:al1",
+        "name": "album",
+        "album_type": "album",
+        "release_date": "2020-01-01",
+        "external_urls": {"spotify": "https://open.spotify.com/album/al1"},
+        "artists": [artist()],
+        "images": [],
+    }
+
+
+def simplified_track():
+    return {
+        "id": "t1",
+        "uri": "spotify:track:t1",
+        "name": "track",
+        "duration_ms": 200_000,
+        "artists": [artist()],
+    }
+
+
+def test_full_then_simplified_keeps_the_full_data():
+    full_track = dict(
+        simplified_track(),
+        album=simplified_album(),
+        external_ids={"isrc": "USRC17607839"},
+        popularity=50,
+    )
+    full_album = dict(
+        simplified_album(),
+        total_tracks=12,
+        tracks={"items": [full_track], "total": 12},
+    )
+
+    album = Album(full_album)
+    track = Track(full_track)
+
+    # albums nested in tracks, and tracks listed by an album, come simplified
+    assert Album(dict(simplified_album(), total_tracks=0)) is album
+    assert Track(simplified_track(), album=simplified_album()) is track
+
+    assert "tracks" in album._data
+    assert album.total_tracks == 12
+    assert track._data["external_ids"] == {"isrc": "USRC17607839"}
+    assert track._data["popularity"] == 50
+    assert track.album is album
+
+
+def test_simplified_then_full_fills_in_the_rest():
+    track = Track(simplified_track(), album=simplified_album())
+
+    Track(dict(simplified_track(), external_ids={"isrc": "USRC17607839"}))
+
+    assert track._data["external_ids"] == {"isrc": "USRC17607839"}
+
+
+def test_newer_payloads_replace_stale_values():
+    artist_ = Artist(dict(artist(), followers={"total": 10}, genres=["house"]))
+
+    refetched = Artist(
+        dict(artist(), name="renamed", followers={"total": 20}, genres=["disco"])
+    )
+
+    assert refetched is artist_
+    assert (artist_.name, artist_.followers, artist_.genres) == (
+        "renamed",
+        20,
+        ["disco"],
+    )
+
+    # seen again nested in a track, without any of the full fields
+    Artist(dict(artist(), name="renamed"))
+    assert (artist_.followers, artist_.genres) == (20, ["disco"])
+
+    track = Track(dict(simplified_track(), popularity=50, external_ids={"isrc": "X"}))
+    Track(dict(simplified_track(), popularity=60))
+
+    assert track._data["popularity"] == 60
+    assert track._data["external_ids"] == {"isrc": "X"}
@@ -0,0 +1,95 @@
+import pytest
+
+from melodine.matches import MatchCache, best_match
+from melodine.spotify.track import Track
+
+
+def result(video_id, title, *artists):
+    return {
+        "videoId": video_id,
+        "title": title,
+        "artists": [{"name": artist} for artist in artists],
+    }
+
+
+def test_tracks_and_videos_are_compared_the_same_way():
+    video_id, confidence = best_match(
+        ["Daft Punk", "Pharrell Williams"],
+        "Get Lucky",
+        [
+            result("other", "Get Lucky (Cover)", "Someone Else"),
+            result("original", "Get Lucky", "Daft Punk", "Pharrell Williams"),
+        ],
+    )
+
+    assert video_id == "original"
+    assert confidence == 1.0
+
+
+class FakeYTMusic:
+    def __init__(self, results):
+        self.results = results
+        self.searches = 0
+
+    def search(self, query, filter=None):
+        self.searches += 1
+        return self.results
+
+
+@pytest.fixture
+def matches(patch_service, tmp_path):
+    return patch_service("matches", MatchCache(str(tmp_path / "matches.sqlite3")))
+
+
+def artist(id, name):
+    return {
+        "id": id,
+        "uri": f"spotify:artist:{id}",
+        "name": name,
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{id}"},
+    }
+
+
+def track(idx):
+    return Track(
+        {
+            "id": f"match{idx}",
+            "uri": f"spotify:track:match{idx}",
+            "name": "Get Lucky",
+            "duration_ms": 248_000,
+            "artists": [artist("dp", "Daft Punk"), artist("pw", "Pharrell Williams")],
+            "external_ids": {"isrc": f"ISRC{idx}"},
+        }
+    )
+
+
+def test_confident_matches_are_kept(patch_service, matches):
+    ytmusic = patch_service(
+        "ytmusic",
+        FakeYTMusic(
+            [result("original", "Get Lucky", "Daft Punk", "Pharrell Williams")]
+        ),
+    )
+
+    assert track(1)._match_video_id() == "original"
+    assert track(1)._match_video_id() == "original"
+
+    assert ytmusic.searches == 1
+    assert matches.get("match1") == ("original", 1.0)
+
+
+def test_unconfident_matches_are_searched_for_again(patch_service, matches):
+    ytmusic = patch_service(
+        "ytmusic", FakeYTMusic([result("cover", "Lucky Day", "A Cover Band")])
+    )
+
+    assert track(2)._match_video_id() == "cover"
+    assert track(2)._match_video_id() == "cover"
+
+    assert ytmusic.searches == 2
+    assert matches.get("match2") is None
+
+    # matched before there was a threshold
+    matches.put("match3", "ISRC3", "cover", 0.2)
+    track(3)._match_video_id()
+    assert ytmusic.searches == 3
@@ -0,0 +1,219 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from melodine.spotify import playlist as playlist_module
+from melodine.spotify.playlist import Playlist
+from melodine.spotify.track import Track
+
+# `melodine.spotify.client` is shadowed by the client it exports
+client_module = importlib.import_module("melodine.spotify.client")
+
+
+def track(idx):
+    return {
+        "id": f"t{idx}",
+        "uri": f"spotify:track:t{idx}",
+        "name": f"track {idx}",
+        "duration_ms": 1000,
+        "artists": [{"id": "ar", "uri": "spotify:artist:ar", "name": "artist"}],
+        "album": {"id": "al", "uri": "spotify:album:al", "name": "album"},
+    }
+
+
+class FakeSpotify:
+    def __init__(self, total, unavailable=()):
+        self.items = [
+            {
+                "track": None if idx in unavailable else track(idx),
+                "added_at": "2020-01-01T00:00:00Z",
+                "added_by": {"id": "me", "uri": "spotify:user:me"},
+            }
+            for idx in range(total)
+        ]
+        self.snapshot_id = "snapshot-1"
+        self.pages = []
+        self.added = []
+        self.removed = []
+        self.fetched = []
+
+    def playlist(self, id, fields=None):
+        return {
+            "id": id,
+            "name": "playlist",
+            "uri": f"spotify:playlist:{id}",
+            "owner": {"id": "me", "uri": "spotify:user:me"},
+            "snapshot_id": self.snapshot_id,
+            "tracks": {"total": len(self.items)},
+        }
+
+    def playlist_tracks(self, id, limit=100, offset=0):
+        self.pages.append(offset)
+        return {"items": self.items[offset : offset + limit], "total": len(self.items)}
+
+    def _new_snapshot(self):
+        self.snapshot_id = f"snapshot-{int(self.snapshot_id.split('-')[1]) + 1}"
+        return {"snapshot_id": self.snapshot_id}
+
+    def playlist_reorder_items(self, id, range_start, insert_before, **kwargs):
+        moved = self.items.pop(range_start)
+        self.items.insert(insert_before, moved)
+        return self._new_snapshot()
+
+    def playlist_add_items(self, id, items, position=None):
+        self.added.append((list(items), position))
+        added = [
+            {
+                "track": track(int(uri.split(":t")[-1])),
+                "added_at": "2020-01-01T00:00:00Z",
+            }
+            for uri in items
+        ]
+        position = len(self.items) if position is None else position
+        self.items[position:position] = added
+        return self._new_snapshot()
+
+    def playlist_remove_all_occurrences_of_items(self, id, items, snapshot_id=None):
+        self.removed.append((list(items), snapshot_id))
+        self.items = [
+            item
+            for item in self.items
+            if not item["track"] or item["track"]["uri"] not in items
+        ]
+        return self._new_snapshot()
+
+    def tracks(self, ids):
+        self.fetched.append(list(ids))
+        return {"tracks": [track(int(id[1:])) for id in ids]}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(app_dir, monkeypatch):
+    monkeypatch.setattr(playlist_module, "_CACHE_DIR", str(app_dir / "playlists"))
+
+
+@pytest.fixture(autouse=True)
+def client(monkeypatch):
+    client = SimpleNamespace(id="me", uri="spotify:user:me", name="me")
+    monkeypatch.setattr(client_module, "client", client)
+    return client
+
+
+def server_ids(spotify):
+    return [item["track"]["id"] for item in spotify.items if item["track"]]
+
+
+@pytest.fixture
+def spotify(patch_service):
+    return patch_service("spotify", FakeSpotify(250, unavailable={150, 220}))
+
+
+def test_unavailable_tracks_keep_the_server_positions(spotify):
+    playlist = Playlist.from_id("pl")
+
+    tracks = list(playlist.iter_tracks())
+
+    assert len(tracks) == 248
+    assert playlist.total_tracks == 250
+    assert playlist._fully_loaded
+    assert playlist.get_tracks(limit=3, offset=199) == tracks[198:201]
+
+    # moving the track at (server) position 200 to the start moves `t200`
+    playlist.reorder_items(200, 0)
+    assert playlist.tracks[0].id == spotify.items[0]["track"]["id"] == "t200"
+
+
+def test_fully_loaded_playlists_are_read_from_the_cache(spotify):
+    list(Playlist.from_id("pl").iter_tracks())
+    spotify.pages.clear()
+
+    playlist = Playlist.from_id("pl")
+
+    assert spotify.pages == []
+    assert playlist.total_tracks == 250
+    assert [track.id for track in playlist.iter_tracks()] == [
+        item["track"]["id"] for item in spotify.items if item["track"]
+    ]
+
+
+def test_from_id_skips_unavailable_tracks_in_the_first_page(patch_service):
+    patch_service("spotify", FakeSpotify(50, unavailable={3}))
+
+    playlist = Playlist.from_id("pl")
+
+    assert playlist._fully_loaded
+    assert len(playlist.tracks) == 49
+    assert "t3" not in {track.id for track in playlist.tracks}
+
+
+def test_reopening_a_loaded_playlist_picks_up_a_new_snapshot(spotify):
+    playlist = Playlist.from_id("pl")
+    list(playlist.iter_tracks())
+
+    # the playlist changes elsewhere
+    del spotify.items[:2]
+    spotify.snapshot_id = "snapshot-2"
+    spotify.pages.clear()
+
+    reopened = Playlist.from_id("pl")
+
+    assert reopened is playlist
+    assert playlist.snapshot_id == "snapshot-2"
+    assert playlist.total_tracks == 248
+    assert [track.id for track in playlist.iter_tracks()] == [
+        item["track"]["id"] for item in spotify.items if item["track"]
+    ]
+    # and nothing was served from the cache of the old snapshot
+    assert spotify.pages == [0, 100, 200]
+
+
+def test_adding_more_than_a_request_takes_is_chunked(spotify):
+    playlist = Playlist.from_id("pl")
+    list(playlist.iter_tracks())
+    uris = [f"spotify:track:t{idx}" for idx in range(1000, 1230)]
+
+    playlist.add_items(uris, position=10)
+
+    assert [(len(batch), position) for batch, position in spotify.added] == [
+        (100, 10),
+        (100, 110),
+        (30, 210),
+    ]
+    assert playlist.snapshot_id == spotify.snapshot_id
+    assert playlist.total_tracks == 480
+    assert [track.id for track in playlist.tracks] == server_ids(spotify)
+
+
+def test_added_items_are_inserted_at_their_position(spotify, client):
+    playlist = Playlist.from_id("pl")
+    track_ = Track(track(2000))
+
+    playlist.add_items([track_, "t2001", "spotify:track:t2002"], position=5)
+
+    # only the items given as ids are fetched
+    assert spotify.fetched == [["t2001", "t2002"]]
+    assert [track.id for track in playlist.tracks[4:8]] == [
+        "t4",
+        "t2000",
+        "t2001",
+        "t2002",
+    ]
+    assert playlist.tracks[5].added_by is client
+    assert len(playlist.tracks) == 103
+    assert playlist.total_tracks == 253
+
+
+def test_removing_from_a_partly_loaded_playlist_refreshes_the_total(spotify):
+    playlist = Playlist.from_id("pl")
+
+    playlist.remove_items(["t3", "spotify:track:t200", "t3"])
+
+    assert spotify.removed == [
+        (["spotify:track:t3", "spotify:track:t200"], "snapshot-1")
+    ]
+    # how many of the tracks were past the loaded ones is only known from the server
+    assert playlist.total_tracks == 248
+    assert playlist.snapshot_id == spotify.snapshot_id
+    assert "t3" not in [track.id for track in playlist.tracks]
+    assert [track.id for track in playlist.iter_tracks()] == server_ids(spotify)
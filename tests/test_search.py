@@ -0,0 +1,68 @@
+import importlib
+import threading
+import time
+
+import pytest
+
+MODULES = ["melodine.spotify._search", "melodine.ytmusic.views.search"]
+
+
+@pytest.fixture(params=MODULES)
+def searches(request, monkeypatch):
+    """stand in for a module's `search`, recording the queries it gets"""
+    module = importlib.import_module(request.param)
+    module._search_cached.cache_clear()
+    searched = []
+    lock = threading.Lock()
+
+    def search(q, types=(), limit=20):
+        with lock:
+            searched.append(q)
+        if q == "broken":
+            raise RuntimeError("search failed")
+        # the earlier queries take longer
+        time.sleep({"first": 0.2, "second": 0.1}.get(q, 0))
+        return f"results for {q}"
+
+    monkeypatch.setattr(module, "search", search)
+    yield module, searched
+    module._search_cached.cache_clear()
+
+
+def test_results_come_in_the_order_of_the_queries(searches):
+    module, _ = searches
+
+    results = list(module.search_many(["first", "second", "third"], window=3))
+
+    assert results == [
+        ("first", "results for first"),
+        ("second", "results for second"),
+        ("third", "results for third"),
+    ]
+
+
+def test_results_come_as_they_arrive_when_unordered(searches):
+    module, _ = searches
+
+    results = module.search_many(["first", "second", "third"], ordered=False, window=3)
+
+    assert [query for query, _ in results] == ["third", "second", "first"]
+
+
+def test_normalized_queries_are_searched_once(searches):
+    module, searched = searches
+
+    results = list(module.search_many(["Daft  Punk", "daft punk"], window=1))
+    results += list(module.search_many(["DAFT PUNK "]))
+
+    assert searched == ["daft punk"]
+    assert [result for _, result in results] == ["results for daft punk"] * 3
+
+
+def test_a_failing_query_doesnt_stop_the_others(searches):
+    module, _ = searches
+
+    results = dict(module.search_many(["first", "broken", "third"], window=2))
+
+    assert isinstance(results.pop("broken"), RuntimeError)
+    assert results == {"first": "results for first", "third": "results for third"}
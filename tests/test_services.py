@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from unittest import mock
+
+import pytest
+
+from melodine.services import service
+
+Services = type(service)
+
+THREADS = 16
+
+
+def counting(name, calls):
+    """a slow stand-in constructor, which makes racing constructions likely"""
+
+    def construct(*args, **kwargs):
+        calls[name] += 1
+        time.sleep(0.01)
+        return mock.MagicMock(name=name)
+
+    return construct
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    spotipy = pytest.importorskip("spotipy")
+    ytmusicapi = pytest.importorskip("ytmusicapi")
+    pyyoutube = pytest.importorskip("pyyoutube")
+    innertube = pytest.importorskip("innertube")
+
+    calls = Counter()
+    monkeypatch.setattr(spotipy, "Spotify", counting("spotify", calls))
+    monkeypatch.setattr(spotipy, "SpotifyOAuth", counting("spotify-auth", calls))
+    monkeypatch.setattr(
+        spotipy, "SpotifyClientCredentials", counting("spotify-auth", calls)
+    )
+    monkeypatch.setattr(spotipy, "CacheFileHandler", mock.MagicMock())
+    monkeypatch.setattr(ytmusicapi, "YTMusic", counting("ytmusic", calls))
+    monkeypatch.setattr(pyyoutube, "Api", counting("yt", calls))
+    monkeypatch.setattr(innertube, "InnerTube", counting("innertube", calls))
+    monkeypatch.setitem(
+        sys.modules,
+        "youtube_dl",
+        types.SimpleNamespace(YoutubeDL=counting("ytdl", calls)),
+    )
+    monkeypatch.setattr(
+        Services, "_load_cipher", lambda self, cls: counting("cipher", calls)()
+    )
+    return calls
+
+
+def test_clients_are_built_once_across_threads(calls):
+    services = Services()
+    barrier = threading.Barrier(THREADS)
+    built = []
+
+    def use_every_client():
+        barrier.wait()
+        built.append(
+            (
+                services.spotify,
+                services.ytmusic,
+                services.yt,
+                services.ytdl,
+                services.innertube,
+                services.cipher,
+            )
+        )
+
+    threads = [threading.Thread(target=use_every_client) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == {
+        "spotify": 1,
+        "spotify-auth": 1,
+        "ytmusic": 1,
+        "yt": 1,
+        "ytdl": 1,
+        "innertube": 1,
+        "cipher": 1,
+    }
+    # every thread got the very same clients
+    assert len({tuple(map(id, clients)) for clients in built}) == 1
@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the heavy backend dependencies, none of which should be imported before they're used
+BACKENDS = ("spotipy", "ytmusicapi", "innertube", "pytube", "youtube_dl", "pyyoutube")
+
+# the other slow to import dependencies, only needed once something is fetched or played
+HEAVY = ("requests", "httpx", "urllib3", "numpy", "dacite")
+
+# seconds a cold `import melodine` may take, on top of the interpreter's own startup
+IMPORT_BUDGET = 0.25
+
+
+def cold_import(module: str) -> dict:
+    """import `module` in a fresh interpreter, returning how long it took and what got imported"""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def loaded_backends(modules, packages=BACKENDS) -> list:
+    return [module for module in modules if module.split(".")[0] in packages]
+
+
+def test_import_melodine_loads_no_backend():
+    result = cold_import("melodine")
+
+    assert loaded_backends(result["modules"]) == []
+    assert loaded_backends(result["modules"], HEAVY) == []
+    assert not any(
+        module.startswith("melodine.spotify") for module in result["modules"]
+    )
+
+
+@pytest.mark.benchmark
+def test_import_melodine_within_budget():
+    # the best of a few runs, so a busy machine doesn't fail the check
+    elapsed = min(cold_import("melodine")["elapsed"] for _ in range(3))
+
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_import_spotify_loads_no_backend():
+    result = cold_import("melodine.spotify")
+
+    assert loaded_backends(result["modules"]) == []
+    assert loaded_backends(result["modules"], HEAVY) == []
+    # the match cache (sqlite3) is only needed once a track is played
+    assert "sqlite3" not in result["modules"]
@@ -0,0 +1,129 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import pytest
+import requests
+
+from melodine.services import service
+
+STREAM_SIZE = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+THROTTLED_DELAY = 0.01  # per chunk, ~1.6 MB/s
+
+
+class FakeCipher:
+    """deciphers by reversing, so the expected values are easy to tell apart"""
+
+    def get_signature(self, ciphered_signature):
+        return ciphered_signature[::-1]
+
+    def calculate_n(self, initial_n):
+        return initial_n[::-1]
+
+
+@pytest.fixture
+def cipher(patch_service):
+    return patch_service("cipher", FakeCipher())
+
+
+def test_sign_url_rewrites_n_and_keeps_the_other_parameters(cipher):
+    url = "https://rr1.googlevideo.com/videoplayback?" + urlencode(
+        {"expire": "1700000000", "n": "aBc-123", "itag": "251", "mime": "audio/webm"}
+    )
+    sig_cipher = urlencode({"s": "sig-nature", "sp": "sig", "url": url})
+
+    signed = urlsplit(service.sign_url(sig_cipher))
+    query = parse_qs(signed.query)
+
+    assert signed.path == "/videoplayback"
+    assert query.pop("n") == ["321-cBa"]
+    assert query.pop("sig") == ["erutan-gis"]
+    assert query.pop("ratebypass") == ["yes"]
+    assert query == {
+        "expire": ["1700000000"],
+        "itag": ["251"],
+        "mime": ["audio/webm"],
+    }
+
+
+def test_dethrottle_url_only_touches_n(cipher):
+    url = "https://rr1.googlevideo.com/videoplayback?itag=251&nn=abc&n=xyz&sn=1"
+
+    assert service.dethrottle_url(url) == (
+        "https://rr1.googlevideo.com/videoplayback?itag=251&nn=abc&n=zyx&sn=1"
+    )
+    assert service.dethrottle_url("https://example.com/a?itag=251") == (
+        "https://example.com/a?itag=251"
+    )
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """serves a stream slowly, unless it's asked for with the deciphered `n`"""
+
+    expected_n = ""
+    # the `n` of each request, and wether it was throttled
+    served = []
+
+    def do_GET(self):
+        n = parse_qs(urlsplit(self.path).query).get("n", [""])[0]
+        delay = 0 if n == self.expected_n else THROTTLED_DELAY
+        self.served.append((n, bool(delay)))
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(STREAM_SIZE))
+        self.end_headers()
+        chunk = b"\0" * CHUNK_SIZE
+        for _ in range(STREAM_SIZE // CHUNK_SIZE):
+            self.wfile.write(chunk)
+            time.sleep(delay)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_server(cipher, monkeypatch):
+    monkeypatch.setattr(ThrottlingHandler, "expected_n", cipher.calculate_n("aBc-123"))
+    monkeypatch.setattr(ThrottlingHandler, "served", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _download(url):
+    with requests.get(url, stream=True, timeout=30) as response:
+        return sum(len(chunk) for chunk in response.iter_content(CHUNK_SIZE))
+
+
+def _throughput(url):
+    start = time.perf_counter()
+    size = _download(url)
+    assert size == STREAM_SIZE
+    return size / (time.perf_counter() - start)
+
+
+def test_dethrottled_stream_is_served_unthrottled(throttling_server):
+    url = throttling_server + "/videoplayback?" + urlencode({"n": "aBc-123"})
+
+    assert _download(service.dethrottle_url(url)) == STREAM_SIZE
+    assert ThrottlingHandler.served == [("321-cBa", False)]
+
+
+@pytest.mark.benchmark
+def test_benchmark_dethrottled_stream_throughput(throttling_server):
+    url = throttling_server + "/videoplayback?" + urlencode({"n": "aBc-123"})
+
+    throttled = _throughput(url)
+    dethrottled = _throughput(service.dethrottle_url(url))
+
+    print(
+        f"\nthrottled: {throttled / 1e6:.1f} MB/s, "
+        f"dethrottled: {dethrottled / 1e6:.1f} MB/s "
+        f"({dethrottled / throttled:.0f}x)"
+    )
+    assert dethrottled > 5 * throttled
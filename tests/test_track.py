@@ -0,0 +1,102 @@
+import time
+import tracemalloc
+from collections import Counter
+
+import pytest
+
+from melodine.spotify.album import Album
+from melodine.spotify.artist import Artist
+from melodine.spotify.track import PlaylistTrack
+from melodine.spotify.user import User
+from melodine.utils import Image
+
+ROWS = 10_000
+
+
+def item(idx):
+    artist = {
+        "id": f"artist{idx}",
+        "uri": f"spotify:artist:artist{idx}",
+        "name": f"artist {idx}",
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/artist{idx}"},
+    }
+    images = [
+        {"url": f"https://i.scdn.co/image/{idx}-{size}", "width": size, "height": size}
+        for size in (640, 300, 64)
+    ]
+    return {
+        "track": {
+            "id": f"track{idx}",
+            "uri": f"spotify:track:track{idx}",
+            "name": f"track {idx}",
+            "duration_ms": 200_000,
+            "artists": [artist],
+            "album": {
+                "id": f"album{idx}",
+                "uri": f"spotify:album:album{idx}",
+                "name": f"album {idx}",
+                "external_urls": {
+                    "spotify": f"https://open.spotify.com/album/album{idx}"
+                },
+                "release_date": "2020-01-01",
+                "artists": [artist],
+                "images": images,
+            },
+        },
+        "added_at": "2020-01-01T00:00:00Z",
+        "added_by": {"id": "me", "uri": "spotify:user:me"},
+    }
+
+
+def build(first, touch, traced=False):
+    """build a playlist's worth of tracks, returning the time taken and the peak memory"""
+    # every build gets it's own ids, so none of the models are shared through the identity map
+    items = [item(idx) for idx in range(first, first + ROWS)]
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    tracks = [PlaylistTrack(data) for data in items]
+    if touch:
+        for track in tracks:
+            track.album, track.artists, track.images, track.added_at, track.added_by
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def test_playlist_tracks_build_nested_models_once_accessed(monkeypatch):
+    built = Counter()
+    for cls in (Album, Artist, Image, User):
+
+        def init(self, *args, __init__=cls.__init__, **kwargs):
+            built[type(self).__name__] += 1
+            __init__(self, *args, **kwargs)
+
+        monkeypatch.setattr(cls, "__init__", init)
+
+    tracks = [PlaylistTrack(item(idx)) for idx in range(4 * ROWS, 4 * ROWS + 100)]
+    assert built == {}
+
+    for track in tracks[:10]:
+        track.album, track.images, track.added_by
+    assert built == {"Album": 10, "Artist": 10, "Image": 30, "User": 10}
+
+
+@pytest.mark.benchmark
+def test_benchmark_playlist_tracks_build_nested_models_lazily():
+    # timed without tracing, which slows every allocation down
+    lazy_time, _ = build(0, touch=False)
+    eager_time, _ = build(ROWS, touch=True)
+    _, lazy_peak = build(2 * ROWS, touch=False, traced=True)
+    _, eager_peak = build(3 * ROWS, touch=True, traced=True)
+
+    print(
+        f"\n{ROWS} playlist tracks, "
+        f"lazy: {lazy_time:.2f}s {lazy_peak / 1e6:.1f} MB, "
+        f"every nested model built: {eager_time:.2f}s {eager_peak / 1e6:.1f} MB"
+    )
+    assert lazy_time < eager_time
+    assert lazy_peak < eager_peak
@@ -0,0 +1,121 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from melodine.services import Transport, TransportConfig, service
+
+
+def test_sessions_are_per_thread_over_one_adapter():
+    transport = Transport(TransportConfig())
+    sessions = []
+
+    threads = [
+        threading.Thread(target=lambda: sessions.append(transport.session))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 4
+    assert all(
+        session.get_adapter("https://api.spotify.com") is transport.adapter
+        for session in sessions
+    )
+
+
+def test_new_session_shares_the_adapter():
+    transport = Transport(TransportConfig())
+
+    session = transport.new_session()
+
+    assert session is not transport.session
+    assert session.get_adapter("https://music.youtube.com") is transport.adapter
+
+
+def test_innertube_client_is_replaced_and_closed(monkeypatch):
+    innertube = pytest.importorskip("innertube")
+
+    built = []
+    original_init = innertube.InnerTube.__init__
+
+    def init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        built.append(self.adaptor.session)
+
+    monkeypatch.setattr(innertube.InnerTube, "__init__", init)
+    monkeypatch.setattr(service, "_Services__innertube", None)
+
+    client = service.innertube
+
+    assert built[0].is_closed
+    assert client.adaptor.session is not built[0]
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """answers with the queued statuses first, and `200` after them"""
+
+    statuses = []
+
+    def do_GET(self):
+        status = self.statuses.pop(0) if self.statuses else 200
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport():
+    return Transport(
+        TransportConfig(rate_limits={"127.0.0.1": 1000.0}, backoff_factor=0)
+    )
+
+
+def test_every_retry_waits_for_the_hosts_turn(transport, flaky_server):
+    FlakyHandler.statuses = [503, 429, 502]
+
+    response = transport.session.get(flaky_server)
+
+    stats = transport.limiter.stats()["127.0.0.1"]
+    assert response.status_code == 200
+    assert stats["requests"] == 4
+    assert stats["throttled"] == 1
+
+
+def test_retries_give_up_with_the_last_response(transport, flaky_server):
+    FlakyHandler.statuses = [503] * 10
+
+    response = transport.session.get(flaky_server)
+
+    assert response.status_code == 503
+    assert transport.limiter.stats()["127.0.0.1"]["requests"] == 4
+
+
+def test_httpx_client_resends_throttled_requests(transport, flaky_server):
+    FlakyHandler.statuses = [429, 429]
+
+    with transport.httpx_client() as client:
+        response = client.get(flaky_server)
+
+    stats = transport.limiter.stats()["127.0.0.1"]
+    assert response.status_code == 200
+    assert stats["requests"] == 3
+    assert stats["throttled"] == 2
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from melodine.utils import (
+    atomic_path,
+    fetch_by_ids,
+    iter_concurrently,
+    iter_offset_pages,
+)
+
+
+def test_fetch_by_ids_batches_and_keeps_the_order():
+    requested = []
+
+    def endpoint(batch):
+        requested.append(list(batch))
+        return {"tracks": [None if id == "gone" else {"id": id} for id in batch]}
+
+    ids = [str(idx) for idx in range(7)] + ["gone", "7"]
+    results = fetch_by_ids(dict, endpoint, "tracks", ids, batch_size=3)
+
+    assert sorted(map(len, requested)) == [3, 3, 3]
+    assert [result and result["id"] for result in results] == ids[:7] + [None, "7"]
+
+
+def test_atomic_path_replaces_the_whole_file(tmp_path):
+    path = tmp_path / "entry.json"
+    path.write_text("old")
+
+    with atomic_path(str(path)) as temp_path:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write("new")
+        assert path.read_text() == "old"
+
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ["entry.json"]
+
+
+def test_atomic_path_keeps_the_old_file_when_writing_fails(tmp_path):
+    path = tmp_path / "entry.json"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_path(str(path)) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write("partial")
+            raise RuntimeError
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["entry.json"]
+
+
+def test_iter_concurrently_raises_or_returns_exceptions():
+    def check(item):
+        if item == 2:
+            raise ValueError(item)
+        return item * 10
+
+    with pytest.raises(ValueError):
+        list(iter_concurrently(check, range(4)))
+
+    results = list(iter_concurrently(check, range(4), return_exceptions=True))
+
+    assert [item for item, _ in results] == [0, 1, 2, 3]
+    assert isinstance(results[2][1], ValueError)
+    assert [result for _, result in results[:2] + results[3:]] == [0, 10, 30]
+
+
+def test_iter_offset_pages_keeps_the_page_order():
+    pages = iter_offset_pages(
+        lambda offset: list(range(offset, min(offset + 10, 95))),
+        total=95,
+        page_size=10,
+        start=20,
+        window=3,
+    )
+
+    assert [item for page in pages for item in page] == list(range(20, 95))